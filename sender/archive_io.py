@@ -0,0 +1,218 @@
+"""
+Hourly log archiving shared by the GNSS services.
+
+Compresses a finished log file with zstd, publishes the .zst atomically,
+writes a sha256sum-compatible .zst.sha256 next to it and removes the
+original once both are durable.
+
+A trained zstd dictionary is only used when one is configured; archives
+made with it need the same dictionary to decompress (zstd -d -D <dict>),
+so its ID is noted in the .zst.sha256 file.
+"""
+
+import os
+import hashlib
+import shutil
+import logging
+import threading
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Long-distance matching over a window of up to 128 MiB
+# (2^27, the default zstd decoder limit, so no --long needed to decompress)
+ZSTD_WINDOW_LOG = 27
+
+# Largest zstd frame header (magic, descriptor, window, dict ID, content size)
+ZSTD_FRAME_HEADER_MAX = 18
+
+
+class CompressionAborted(Exception):
+    """Raised inside a compression when its abort event is set"""
+
+
+class HashingWriter:
+    """
+    File-like wrapper that SHA256-hashes everything written through it.
+    If abort is given, a write after it is set raises CompressionAborted.
+    """
+
+    def __init__(self, fh, abort: Optional[threading.Event] = None):
+        self.fh = fh
+        self.sha256 = hashlib.sha256()
+        self.abort = abort
+
+    def write(self, data) -> int:
+        if self.abort is not None and self.abort.is_set():
+            raise CompressionAborted()
+        self.sha256.update(data)
+        return self.fh.write(data)
+
+    def flush(self):
+        self.fh.flush()
+
+
+class AbortableReader:
+    """
+    File-like wrapper whose reads raise CompressionAborted once abort is set.
+    Multi-threaded zstd may buffer a whole job before writing any output,
+    so checking the input side is what keeps an abort prompt.
+    """
+
+    def __init__(self, fh, abort: threading.Event):
+        self.fh = fh
+        self.abort = abort
+
+    def read(self, size: int = -1) -> bytes:
+        if self.abort.is_set():
+            raise CompressionAborted()
+        return self.fh.read(size)
+
+
+def build_compressor(level: int, dict_path: Optional[str] = None):
+    """
+    Build the zstd compressor for hourly logs.
+    Uses all cores and long-distance matching. A trained dictionary is
+    used only if dict_path is set (it is then needed to decompress).
+    """
+    params = zstandard.ZstdCompressionParameters.from_level(
+        level,
+        window_log=ZSTD_WINDOW_LOG,
+        enable_ldm=True,
+        threads=-1,
+        write_dict_id=True,  # frames name the dictionary they need
+    )
+
+    dict_data = None
+    if dict_path:
+        try:
+            with open(dict_path, "rb") as f:
+                dict_data = zstandard.ZstdCompressionDict(f.read())
+        except OSError as e:
+            logger.error(f"Cannot read zstd dictionary {dict_path}, compressing without it: {e}")
+        else:
+            logger.info(f"Using zstd dictionary: {dict_path} (id {dict_data.dict_id()})")
+
+    return zstandard.ZstdCompressor(compression_params=params, dict_data=dict_data)
+
+
+def compress_into(cctx, src_path: str, df, abort: Optional[threading.Event] = None) -> str:
+    """
+    Stream-compress src_path into the open binary file df with zstd and fsync it.
+    The source is read once; the output is hashed as it is written.
+    Returns the hex SHA256 of the compressed bytes.
+    Raises CompressionAborted if abort is set while compressing.
+    """
+    with open(src_path, "rb") as sf:
+        out = HashingWriter(df, abort)
+        src = sf if abort is None else AbortableReader(sf, abort)
+        cctx.copy_stream(src, out, size=os.fstat(sf.fileno()).st_size, read_size=1 << 20)
+        df.flush()
+        os.fsync(df.fileno())
+    return out.sha256.hexdigest()
+
+
+def publish_compressed(cctx, src_path: str, dst_path: str,
+                       abort: Optional[threading.Event] = None) -> str:
+    """
+    Compress src_path and atomically publish the result as dst_path.
+
+    On Linux the output goes to an anonymous O_TMPFILE in the target
+    directory and is linked in under its final name once durable, so a
+    crash or abort never leaves a half-written temp file behind. Elsewhere
+    (or on filesystems without O_TMPFILE) it falls back to dst_path + ".tmp"
+    and os.replace, removing the temp file on abort or error.
+    Returns the hex SHA256 of the compressed file.
+    """
+    tmp_path = dst_path + ".tmp"
+    try:
+        fd = os.open(os.path.dirname(dst_path) or ".", os.O_TMPFILE | os.O_RDWR, 0o644)
+    except (AttributeError, OSError):
+        try:
+            with open(tmp_path, "wb") as df:
+                digest = compress_into(cctx, src_path, df, abort)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        os.replace(tmp_path, dst_path)
+        return digest
+
+    # On abort the anonymous file is simply closed and discarded
+    with open(fd, "w+b") as df:
+        digest = compress_into(cctx, src_path, df, abort)
+        try:
+            # linkat() won't overwrite: drop a stale archive from an interrupted run
+            try:
+                os.remove(dst_path)
+            except FileNotFoundError:
+                pass
+            os.link(f"/proc/self/fd/{fd}", dst_path)
+        except OSError:
+            # /proc not usable for linkat: copy the finished archive out instead
+            df.seek(0)
+            with open(tmp_path, "wb") as tf:
+                shutil.copyfileobj(df, tf, 1 << 20)
+                tf.flush()
+                os.fsync(tf.fileno())
+            os.replace(tmp_path, dst_path)
+    return digest
+
+
+def fsync_path(path: str, flags: int = os.O_RDONLY):
+    """fsync a single file or directory by path"""
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def compress_and_checksum(cctx, src_path: str, abort: Optional[threading.Event] = None):
+    """
+    Archive src_path as src_path.zst plus src_path.zst.sha256.
+
+    The SHA256 is computed in the compression pass and written in
+    sha256sum format via a temp file and rename. The original is removed
+    only after both artifacts and their directory entries are durable.
+    Setting abort stops the compression with CompressionAborted, leaving
+    src_path in place and nothing published.
+    """
+    zst_final = src_path + ".zst"
+    sha_final = src_path + ".zst.sha256"
+
+    # Compress with zstd, computing SHA256 in the same pass
+    digest = publish_compressed(cctx, src_path, zst_final, abort)
+
+    # Same line format as sha256sum, naming the published archive
+    sha_out = f"{digest}  {os.path.basename(zst_final)}\n"
+
+    # Note a dictionary the archive depends on (sha256sum -c skips # lines)
+    with open(zst_final, "rb") as f:
+        dict_id = zstandard.get_frame_parameters(f.read(ZSTD_FRAME_HEADER_MAX)).dict_id
+    if dict_id:
+        sha_out += f"# zstd dictionary id {dict_id}: decompress with zstd -d -D <dictionary>\n"
+
+    # Write checksum
+    sha_tmp = sha_final + ".tmp"
+    with open(sha_tmp, "w", encoding="utf-8") as f:
+        f.write(sha_out)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Atomic rename, persisted before the original goes
+    os.replace(sha_tmp, sha_final)
+    fsync_path(os.path.dirname(zst_final) or ".", os.O_DIRECTORY)
+
+    # Remove original
+    try:
+        os.remove(src_path)
+    except FileNotFoundError:
+        pass
@@ -4,7 +4,8 @@ Loads settings from environment variables.
 """
 
 import os
-from pydantic_settings import BaseSettings
+from typing import Literal
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 from dotenv import load_dotenv
 
@@ -30,9 +31,24 @@ class SenderConfig(BaseSettings):
 
     # Sender behavior
     send_interval: int = Field(default=1, description="Seconds between batch sends")
+    max_pending_batches: int = Field(
+        default=60, description="Batches queued for sending before the oldest unsent one is dropped"
+    )
+    request_compression: Literal["zstd", "gzip", "none"] = Field(
+        default="none",
+        description="Content-Encoding for batch request bodies (zstd/gzip need ingest support)",
+    )
+    payload_format: Literal["json", "msgpack"] = Field(
+        default="json", description="Batch body format (msgpack carries UBX as raw bytes instead of base64)"
+    )
 
     # Logging configuration (for combined service)
     log_root_dir: str = Field(default="/data/gnss", description="Root directory for GNSS log files")
+    compression_level: int = Field(default=9, description="zstd level for hourly log compression")
+    compression_dict_path: str = Field(
+        default="",
+        description="Trained zstd dictionary for log compression (opt-in; archives then need it to decompress)",
+    )
 
     # Known position (for reference stations)
     is_reference_station: bool = Field(default=True, description="Whether this is a reference station")
@@ -40,10 +56,16 @@ class SenderConfig(BaseSettings):
     # GNSS device settings (required for live data collection)
     gnss_device: str = Field(default="/dev/ttyAMA0", description="Serial device path for GNSS receiver")
     gnss_baud_rate: int = Field(default=115200, description="Baud rate for GNSS serial connection")
+    reader_process: bool = Field(
+        default=False, description="Read and parse the serial stream in a separate process (own GIL)"
+    )
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    # Settings are read once at startup and never mutated
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        frozen=True,
+    )
 
 
 # Global config instance
@@ -13,25 +13,49 @@ Features:
 - Guaranteed data consistency (same bytes logged and sent)
 
 Requirements:
-    apt install zstd python3-serial
-    pip install pyserial requests pydantic pydantic-settings python-dotenv
+    apt install python3-serial
+    pip install pyserial requests orjson zstandard pydantic pydantic-settings python-dotenv
 """
 
 import os
 import sys
+import gzip
+import json
+import base64
 import time
 import uuid
 import errno
 import signal
+import struct
 import logging
-import subprocess
+import queue
 import threading
+from collections import deque
+from concurrent.futures import Future, wait
 from datetime import datetime, timezone, timedelta
-from typing import List, Tuple, Optional
+from typing import Deque, Dict, List, Tuple, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import config
-from gnss_reader import GNSSReader
+from gnss_reader import GNSSReader, GNSSReaderProcess
+from archive_io import CompressionAborted, build_compressor, compress_and_checksum
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # Configure logging
 logging.basicConfig(
@@ -40,40 +64,125 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global stop flag
-STOP = False
+# Request body encoding to try next when ingest rejects the current one
+COMPRESSION_FALLBACK = {"zstd": "gzip", "gzip": "none"}
+
+# Responses meaning ingest can't read the body encoding: 415 Unsupported
+# Media Type, or 400 from a server parsing compressed bytes as JSON.
+# Any other 4xx (bad API key, schema error) is a real error, not a cue to fall back
+ENCODING_REJECTED_STATUSES = (415, 400)
+
+# Global stop flag (an Event so waits wake up immediately on shutdown)
+STOP = threading.Event()
 
 # File sync settings
 FSYNC_INTERVAL_BYTES = 1_000_000  # fsync after ~1MB written
+WRITE_BUFFER_BYTES = 64 * 1024    # write to disk after ~64KB buffered
+IOV_MAX = 1024                    # max buffers per writev() call on Linux
+
+# Shutdown budget against TimeoutStopSec=30 in combined.service:
+# reader stop (<=3s) + compressions + abort + in-flight send stays under 30s
+COMPRESS_SHUTDOWN_TIMEOUT = 15.0  # let queued archives finish
+COMPRESS_ABORT_TIMEOUT = 3.0      # then abort the running one
+SEND_SHUTDOWN_TIMEOUT = 5.0       # in-flight POST, abandoned after this
+
+# Files whose compression didn't finish at shutdown, retried on next start
+PENDING_COMPRESSIONS_FILE = ".pending_compressions"
+
+# UBX log record timestamp: little-endian double
+_PACK_TS = struct.Struct('<d').pack
 
 
 def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
-    global STOP
     logger.info(f"Received signal {signum}, initiating shutdown...")
-    STOP = True
+    STOP.set()
 
 
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
 
+class BackgroundWorker:
+    """
+    Single daemon thread running submitted calls in order, returning Futures.
+    Unlike ThreadPoolExecutor, whose threads are joined at interpreter exit,
+    shutdown(timeout) really is bounded: work still running after it is
+    abandoned when the process exits.
+    """
+
+    def __init__(self, name: str):
+        self.jobs = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, *args) -> Future:
+        future: Future = Future()
+        self.jobs.put((future, fn, args))
+        return future
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """Stop after the queued jobs; False if still busy after timeout"""
+        self.jobs.put(None)
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+
+def writev_all(fd: int, buffers: List[bytes]):
+    """Gather-write buffers to fd in IOV_MAX-sized calls, completing short writes"""
+    for start in range(0, len(buffers), IOV_MAX):
+        chunk = buffers[start:start + IOV_MAX]
+        written = os.writev(fd, chunk)
+        total = sum(map(len, chunk))
+        if written < total:
+            rest = memoryview(b"".join(chunk))[written:]
+            while rest:
+                rest = rest[os.write(fd, rest):]
+
+
 class FileLogger:
     """
     Manages hourly log files for NMEA and UBX data.
     Handles rotation, compression, and checksumming.
     """
 
-    def __init__(self, root_dir: str = "/data/gnss"):
+    def __init__(self, root_dir: str = "/data/gnss", compression_level: int = 9,
+                 dict_path: Optional[str] = None):
         self.root_dir = root_dir
         self.current_hour = None
+        self.next_rotation_time = 0.0
+        self.last_day_dir: Optional[str] = None
         self.nmea_path: Optional[str] = None
         self.ubx_path: Optional[str] = None
         self.nmea_fh = None
-        self.ubx_fh = None
+        self.ubx_fd: Optional[int] = None
         self.n_written = 0
         self.u_written = 0
 
+        # NMEA write buffer, written out in WRITE_BUFFER_BYTES chunks
+        # (UBX batches go straight to disk with a single writev)
+        self.nmea_buf = bytearray()
+
+        # Compression runs in the background so rotation never stalls reading
+        self.zstd_compressor = build_compressor(compression_level, dict_path) if zstandard else None
+        self.compress_pool = BackgroundWorker("compress")
+        self.pending_compressions: Dict[Future, str] = {}
+        # Set at shutdown to abort the running compression
+        self.compress_abort = threading.Event()
+
         # Ensure root directory exists
         os.makedirs(self.root_dir, exist_ok=True)
 
@@ -88,7 +197,10 @@ class FileLogger:
             dt.strftime("%m"),
             dt.strftime("%d")
         )
-        os.makedirs(day_dir, exist_ok=True)
+        # Only hit the filesystem when the day changes
+        if day_dir != self.last_day_dir:
+            os.makedirs(day_dir, exist_ok=True)
+            self.last_day_dir = day_dir
 
         base = os.path.join(day_dir, dt.strftime("%H"))
         return base + ".nmea", base + ".ubx"
@@ -98,7 +210,6 @@ class FileLogger:
         Compress file to .zst and compute SHA256 checksum.
         Safe to run multiple times (idempotent).
         """
-        zst_tmp = src_path + ".zst.tmp"
         zst_final = src_path + ".zst"
         sha_final = src_path + ".zst.sha256"
 
@@ -110,41 +221,17 @@ class FileLogger:
         if not os.path.exists(src_path):
             return
 
-        try:
-            # Compress with zstd
-            subprocess.run(
-                ["zstd", "-q", "-T0", "-19", "-f", "-o", zst_tmp, src_path],
-                check=True,
-            )
-            os.sync()
-
-            # Compute SHA256
-            sha_out = subprocess.run(
-                ["sha256sum", os.path.basename(zst_tmp)],
-                check=True,
-                cwd=os.path.dirname(zst_tmp),
-                capture_output=True,
-                text=True,
-            ).stdout
-
-            # Write checksum
-            sha_tmp = sha_final + ".tmp"
-            with open(sha_tmp, "w", encoding="utf-8") as f:
-                f.write(sha_out)
-                f.flush()
-                os.fsync(f.fileno())
-
-            # Atomic rename
-            os.replace(zst_tmp, zst_final)
-            os.replace(sha_tmp, sha_final)
-
-            # Remove original
-            os.remove(src_path)
+        if zstandard is None:
+            logger.error("zstandard not installed. Install with: pip install zstandard")
+            return
 
+        try:
+            compress_and_checksum(self.zstd_compressor, src_path, self.compress_abort)
             logger.info(f"Compressed and checksummed: {os.path.basename(src_path)}")
 
-        except FileNotFoundError:
-            logger.error("zstd not found. Install with: apt install zstd")
+        except CompressionAborted:
+            logger.info(f"Compression of {src_path} aborted at shutdown")
+            raise
         except Exception as e:
             logger.error(f"Failed to compress {src_path}: {e}")
 
@@ -155,24 +242,57 @@ class FileLogger:
 
         for src in (prev_nmea, prev_ubx):
             if os.path.exists(src):
-                self._compress_and_checksum(src)
+                self._submit_compression(src)
+
+    def _submit_compression(self, src_path: str):
+        """Queue a file for compression on the background worker"""
+        self.pending_compressions = {
+            f: path for f, path in self.pending_compressions.items() if not f.done()
+        }
+        future = self.compress_pool.submit(self._compress_and_checksum, src_path)
+        self.pending_compressions[future] = src_path
+
+    def _resume_pending_compressions(self):
+        """Queue files left uncompressed by the last shutdown"""
+        state_path = os.path.join(self.root_dir, PENDING_COMPRESSIONS_FILE)
+        try:
+            with open(state_path, encoding="utf-8") as f:
+                paths = [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            return
+
+        for src in paths:
+            # The current hour is still being appended to; it is archived on rotation
+            if src not in (self.nmea_path, self.ubx_path) and os.path.exists(src):
+                logger.info(f"Resuming compression left over from last shutdown: {src}")
+                self._submit_compression(src)
+        os.remove(state_path)
+
+    def _save_pending_compressions(self, paths: List[str]):
+        """Record files whose compression didn't finish, for the next start"""
+        state_path = os.path.join(self.root_dir, PENDING_COMPRESSIONS_FILE)
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(f"{path}\n" for path in paths))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, state_path)
 
     def _open_files(self, dt: datetime):
         """Open new hourly files"""
         # Close existing files
         if self.nmea_fh:
             try:
-                self.nmea_fh.flush()
+                self._flush_nmea()
                 os.fsync(self.nmea_fh.fileno())
                 self.nmea_fh.close()
             except Exception as e:
                 logger.warning(f"Error closing NMEA file: {e}")
 
-        if self.ubx_fh:
+        if self.ubx_fd is not None:
             try:
-                self.ubx_fh.flush()
-                os.fsync(self.ubx_fh.fileno())
-                self.ubx_fh.close()
+                os.fsync(self.ubx_fd)
+                os.close(self.ubx_fd)
             except Exception as e:
                 logger.warning(f"Error closing UBX file: {e}")
 
@@ -182,9 +302,12 @@ class FileLogger:
 
         # Open new files
         self.nmea_path, self.ubx_path = self._get_paths(dt)
-        self.nmea_fh = open(self.nmea_path, "a", buffering=1, encoding="ascii", errors="ignore")
-        self.ubx_fh = open(self.ubx_path, "ab", buffering=0)
+        self.nmea_fh = open(self.nmea_path, "ab", buffering=0)
+        self.ubx_fd = os.open(self.ubx_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
         self.current_hour = dt.hour
+        self.next_rotation_time = (
+            dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        ).timestamp()
 
         logger.info(f"Opened new log files: {os.path.basename(self.nmea_path)}, {os.path.basename(self.ubx_path)}")
 
@@ -194,6 +317,8 @@ class FileLogger:
         self._open_files(now)
         # Compress previous hour if needed
         self._rotate_previous_hour(now)
+        # Finish archives interrupted by the last shutdown
+        self._resume_pending_compressions()
 
     def check_rotation(self):
         """Check if hour has changed and rotate if needed"""
@@ -203,72 +328,112 @@ class FileLogger:
             self._open_files(now)
             self._rotate_previous_hour(now)
 
-    def write_nmea(self, nmea_line: str, timestamp: float):
-        """Write timestamped NMEA line"""
-        if not self.nmea_fh:
+    def _flush_nmea(self):
+        """Write buffered NMEA data to the file"""
+        if self.nmea_buf:
+            self.nmea_fh.write(self.nmea_buf)
+            self.nmea_buf.clear()
+
+    def write_nmea_batch(self, nmea_lines: List[str], ts_str: str):
+        """Write NMEA lines sharing one pre-formatted ISO timestamp"""
+        if not self.nmea_fh or not nmea_lines:
             return
 
         try:
-            # Format: timestamp nmea_sentence
-            ts_str = datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
-            self.nmea_fh.write(f"{ts_str} {nmea_line}\n")
-            self.n_written += len(nmea_line) + len(ts_str) + 2
+            # Format: timestamp nmea_sentence, one line each, encoded in one go
+            prefix = f"{ts_str} "
+            text = prefix + f"\n{prefix}".join(nmea_lines) + "\n"
+            record = text.encode("ascii", errors="ignore")
+            self.nmea_buf += record
+            self.n_written += len(record)
+
+            if len(self.nmea_buf) >= WRITE_BUFFER_BYTES:
+                self._flush_nmea()
 
             # Periodic fsync
             if self.n_written >= FSYNC_INTERVAL_BYTES:
-                self.nmea_fh.flush()
+                self._flush_nmea()
                 os.fsync(self.nmea_fh.fileno())
                 self.n_written = 0
 
         except Exception as e:
             logger.error(f"Error writing NMEA: {e}")
 
-    def write_ubx(self, ubx_bytes: bytes, timestamp: float):
-        """Write timestamped UBX message"""
-        if not self.ubx_fh:
+    def write_ubx_batch(self, ubx_msgs: List[bytes], ts_bytes: bytes):
+        """Write UBX messages sharing one pre-packed 8-byte timestamp"""
+        if self.ubx_fd is None or not ubx_msgs:
             return
 
         try:
-            # Format: 8-byte timestamp (double) + UBX message
-            import struct
-            ts_bytes = struct.pack('<d', timestamp)
-            self.ubx_fh.write(ts_bytes + ubx_bytes)
-            self.u_written += len(ubx_bytes) + 8
+            # Format: 8-byte timestamp (double) + UBX message, for each message.
+            # One scatter-gather syscall, no concatenated copy
+            iov = []
+            for msg in ubx_msgs:
+                iov.append(ts_bytes)
+                iov.append(msg)
+            writev_all(self.ubx_fd, iov)
+            self.u_written += len(ts_bytes) * len(ubx_msgs) + sum(map(len, ubx_msgs))
 
             # Periodic fsync
             if self.u_written >= FSYNC_INTERVAL_BYTES:
-                self.ubx_fh.flush()
-                os.fsync(self.ubx_fh.fileno())
+                os.fsync(self.ubx_fd)
                 self.u_written = 0
 
         except Exception as e:
             logger.error(f"Error writing UBX: {e}")
 
-    def close(self):
-        """Close files and compress current hour"""
+    def close(self, timeout: float = COMPRESS_SHUTDOWN_TIMEOUT):
+        """Close files and compress current hour, waiting at most timeout seconds"""
         logger.info("Closing log files...")
 
         if self.nmea_fh:
             try:
-                self.nmea_fh.flush()
+                self._flush_nmea()
                 os.fsync(self.nmea_fh.fileno())
                 self.nmea_fh.close()
             except Exception:
                 pass
 
-        if self.ubx_fh:
+        if self.ubx_fd is not None:
             try:
-                self.ubx_fh.flush()
-                os.fsync(self.ubx_fh.fileno())
-                self.ubx_fh.close()
+                os.fsync(self.ubx_fd)
+                os.close(self.ubx_fd)
             except Exception:
                 pass
 
         # Compress current hour on shutdown
         if self.nmea_path:
-            self._compress_and_checksum(self.nmea_path)
+            self._submit_compression(self.nmea_path)
         if self.ubx_path:
-            self._compress_and_checksum(self.ubx_path)
+            self._submit_compression(self.ubx_path)
+
+        # Wait for outstanding compressions, but not past systemd's stop timeout
+        _, not_done = wait(self.pending_compressions, timeout=timeout)
+        if not_done:
+            # Don't start queued ones, and abort the running one: its output
+            # is discarded and the source stays in place
+            for future in not_done:
+                future.cancel()
+            self.compress_abort.set()
+        if not self.compress_pool.shutdown(timeout=COMPRESS_ABORT_TIMEOUT):
+            logger.warning("Compression did not stop after abort, abandoning it")
+
+        # Record only jobs that didn't complete and whose source is still there
+        unfinished = sorted(
+            path for future, path in self.pending_compressions.items()
+            if (not future.done() or future.cancelled()
+                or isinstance(future.exception(), CompressionAborted))
+            and os.path.exists(path)
+        )
+        if unfinished:
+            logger.warning(
+                f"{len(unfinished)} compression(s) unfinished at shutdown, "
+                f"retrying on next start: {', '.join(unfinished)}"
+            )
+            try:
+                self._save_pending_compressions(unfinished)
+            except OSError as e:
+                logger.error(f"Could not record unfinished compressions: {e}")
 
 
 class NetworkSender:
@@ -279,60 +444,176 @@ class NetworkSender:
     def __init__(self):
         self.station_id = config.station_id
         self.station_name = config.station_name
+        self.ingest_url = config.ingest_url
         self.sequence_number = 0
+
+        # Batch IDs reuse one random UUID per process and put the sequence
+        # number in its first field: still a valid UUID string, no urandom per batch
+        self.batch_id_suffix = str(uuid.uuid4())[8:]
+
+        # Static batch fields, copied into every batch
+        self.base_batch = {
+            "station_id": self.station_id,
+            "station_name": self.station_name,
+            "is_reference_station": config.is_reference_station,
+        }
+        if config.is_reference_station:
+            self.base_batch["known_position"] = (
+                config.latitude,
+                config.longitude,
+                config.antenna_height
+            )
+
         self.session = requests.Session()
         self.session.headers.update({
             "Authorization": f"Bearer {config.api_key}",
             "Content-Type": "application/json",
+            "Connection": "keep-alive",
         })
 
+        # Reuse one upstream connection and retry transient gateway errors
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=["POST"],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Request body compression (zstd needs the zstandard package)
+        self.compression = config.request_compression
+        if self.compression == "zstd" and zstandard is None:
+            logger.warning("zstandard not installed, compressing request bodies with gzip")
+            self.compression = "gzip"
+        self.zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+        # Set once ingest accepts a body in the current encoding
+        self.compression_confirmed = self.compression == "none"
+
+        # Body format (msgpack ships UBX as raw bytes, JSON as base64 strings)
+        self.payload_format = config.payload_format
+        if self.payload_format == "msgpack" and msgpack is None:
+            logger.warning("msgpack not installed, sending batches as JSON")
+            self.payload_format = "json"
+
         self.batches_sent = 0
         self.batches_failed = 0
+        self.batches_dropped = 0
+
+        # Single background worker: batches go out in order, but a slow POST
+        # never blocks reading, logging or rotation
+        self.send_pool = BackgroundWorker("sender")
+
+        # Queued sends, oldest first; bounded so an ingest outage can't
+        # grow the backlog without limit
+        self.pending: Deque[Future] = deque()
+        self.max_pending_batches = config.max_pending_batches
 
         logger.info(f"Network sender initialized: {self.station_id}")
-        logger.info(f"Target: {config.ingest_url}")
+        logger.info(f"Target: {self.ingest_url}")
         logger.info(f"Send interval: {config.send_interval}s")
 
-    def send_batch(self, nmea_lines: List[str], ubx_base64: List[str]) -> bool:
+    def send_batch(self, nmea_lines: List[str], ubx_raw: List[bytes]) -> Future:
         """
-        Send batch to central-ingest.
-        Returns True if successful, False otherwise.
+        Queue batch for transmission to central-ingest.
+        Returns a Future resolving to True if successful, False otherwise.
         """
         # Increment sequence number
         self.sequence_number += 1
 
         # Build batch (same format as sender.py)
-        batch = {
-            "station_id": self.station_id,
-            "station_name": self.station_name,
-            "batch_id": str(uuid.uuid4()),
-            "sequence_number": self.sequence_number,
-            "recv_ts": time.time(),
-            "nmea_raw": nmea_lines,
-            "ubx_raw": ubx_base64,
-            "is_reference_station": config.is_reference_station,
-        }
-
-        # Add known position if reference station
-        if config.is_reference_station:
-            batch["known_position"] = (
-                config.latitude,
-                config.longitude,
-                config.antenna_height
-            )
+        batch = self.base_batch.copy()
+        batch.update(
+            batch_id=f"{self.sequence_number & 0xFFFFFFFF:08x}{self.batch_id_suffix}",
+            sequence_number=self.sequence_number,
+            recv_ts=time.time(),
+            nmea_raw=nmea_lines,
+            ubx_raw=ubx_raw,
+        )
 
+        # Forget sends that have finished (the single worker runs them in order)
+        pending = self.pending
+        while pending and pending[0].done():
+            pending.popleft()
+
+        # Ingest is falling behind: drop the oldest batch that hasn't started
+        if len(pending) >= self.max_pending_batches:
+            for queued in pending:
+                if queued.cancel():
+                    pending.remove(queued)
+                    self.batches_dropped += 1
+                    logger.warning(f"Send queue full ({self.max_pending_batches} batches), dropped oldest batch")
+                    break
+
+        future = self.send_pool.submit(self._post_batch, batch)
+        pending.append(future)
+        return future
+
+    def _encode_body(self, batch: dict) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Serialize and compress batch for the request body.
+        Returns: (body, extra_headers)
+        """
+        if self.payload_format == "msgpack":
+            body = msgpack.packb(batch, use_bin_type=True)
+            headers = {"Content-Type": "application/msgpack"}
+        else:
+            # JSON can't carry bytes: base64-encode UBX here, off the main loop
+            batch = dict(batch, ubx_raw=[base64.b64encode(msg).decode('ascii') for msg in batch["ubx_raw"]])
+            if orjson is not None:
+                body = orjson.dumps(batch)
+            else:
+                body = json.dumps(batch, allow_nan=False).encode("utf-8")
+            headers = {}
+
+        if self.compression == "zstd":
+            headers["Content-Encoding"] = "zstd"
+            return self.zstd_compressor.compress(body), headers
+        if self.compression == "gzip":
+            headers["Content-Encoding"] = "gzip"
+            return gzip.compress(body, compresslevel=6), headers
+        return body, headers
+
+    def _post_batch(self, batch: dict) -> bool:
+        """POST batch to central-ingest (runs on the send worker)"""
         try:
+            body, headers = self._encode_body(batch)
             response = self.session.post(
-                config.ingest_url,
-                json=batch,
+                self.ingest_url,
+                data=body,
+                headers=headers,
                 timeout=10.0
             )
 
+            # Ingest hasn't yet accepted a body in this encoding and can't read it:
+            # step down zstd -> gzip -> none and resend, keeping the fallback
+            while (response.status_code in ENCODING_REJECTED_STATUSES
+                   and self.compression != "none" and not self.compression_confirmed):
+                fallback = COMPRESSION_FALLBACK[self.compression]
+                logger.warning(
+                    f"Ingest rejected {self.compression} request body "
+                    f"({response.status_code}), falling back to {fallback}"
+                )
+                self.compression = fallback
+                body, headers = self._encode_body(batch)
+                response = self.session.post(
+                    self.ingest_url,
+                    data=body,
+                    headers=headers,
+                    timeout=10.0
+                )
+
             if response.status_code == 202:
+                self.compression_confirmed = True
                 self.batches_sent += 1
                 logger.info(
                     f"✓ Batch {batch['batch_id'][:8]} accepted "
-                    f"(seq={self.sequence_number}, nmea={len(nmea_lines)}, ubx={len(ubx_base64)})"
+                    f"(seq={batch['sequence_number']}, nmea={len(batch['nmea_raw'])}, ubx={len(batch['ubx_raw'])})"
                 )
                 return True
             else:
@@ -344,14 +625,30 @@ class NetworkSender:
             self.batches_failed += 1
             logger.error(f"✗ Network error: {e}")
             return False
+        except Exception as e:
+            # Nobody waits on the future, so surface unexpected errors here
+            self.batches_failed += 1
+            logger.error(f"✗ Unexpected error sending batch: {e}", exc_info=True)
+            return False
+
+    def close(self, timeout: float = SEND_SHUTDOWN_TIMEOUT):
+        """Drop anything still queued, give the in-flight send up to timeout seconds"""
+        self.batches_dropped += sum(1 for future in self.pending if future.cancel())
+        self.pending.clear()
+        if not self.send_pool.shutdown(timeout=timeout):
+            self.batches_dropped += 1
+            logger.warning(f"In-flight batch still sending after {timeout:.0f}s, abandoning it")
 
     def get_stats(self) -> str:
         """Get transmission statistics"""
         total = self.batches_sent + self.batches_failed
         if total == 0:
-            return "No batches sent yet"
+            return f"No batches sent yet, {self.batches_dropped} dropped"
         success_rate = (self.batches_sent / total) * 100
-        return f"{self.batches_sent} sent, {self.batches_failed} failed, success rate={success_rate:.1f}%"
+        return (
+            f"{self.batches_sent} sent, {self.batches_failed} failed, "
+            f"{self.batches_dropped} dropped, success rate={success_rate:.1f}%"
+        )
 
 
 class CombinedService:
@@ -360,8 +657,13 @@ class CombinedService:
     """
 
     def __init__(self):
-        self.reader = GNSSReader(config.gnss_device, config.gnss_baud_rate)
-        self.logger = FileLogger(getattr(config, 'log_root_dir', '/data/gnss'))
+        reader_cls = GNSSReaderProcess if config.reader_process else GNSSReader
+        self.reader = reader_cls(config.gnss_device, config.gnss_baud_rate)
+        self.logger = FileLogger(
+            getattr(config, 'log_root_dir', '/data/gnss'),
+            config.compression_level,
+            config.compression_dict_path,
+        )
         self.sender = NetworkSender()
         self.last_send_time = 0
         self.send_interval = config.send_interval
@@ -386,26 +688,24 @@ class CombinedService:
             # Main loop
             self.last_send_time = time.time()
 
-            while not STOP:
+            while not STOP.is_set():
                 # Check for hour boundary (file rotation)
                 self.logger.check_rotation()
 
                 # Check if it's time to send
                 now = time.time()
                 if now - self.last_send_time >= self.send_interval:
-                    # Get buffered data (with raw UBX for logging)
-                    nmea_lines, ubx_base64, ubx_raw = self.reader.get_buffered_data_with_raw_ubx()
+                    # Get buffered data (raw UBX is both logged and sent)
+                    nmea_lines, ubx_raw = self.reader.get_buffered_raw_data()
 
                     # Send batch (even if empty, for heartbeat)
-                    if nmea_lines or ubx_base64:
-                        self.sender.send_batch(nmea_lines, ubx_base64)
+                    if nmea_lines or ubx_raw:
+                        self.sender.send_batch(nmea_lines, ubx_raw)
 
-                        # Log to files (with timestamps)
-                        for nmea_line in nmea_lines:
-                            self.logger.write_nmea(nmea_line, now)
-
-                        for ubx_msg in ubx_raw:
-                            self.logger.write_ubx(ubx_msg, now)
+                        # Log to files (with timestamps), formatted once per batch
+                        ts_str = datetime.fromtimestamp(now, tz=timezone.utc).isoformat()
+                        self.logger.write_nmea_batch(nmea_lines, ts_str)
+                        self.logger.write_ubx_batch(ubx_raw, _PACK_TS(now))
 
                     self.last_send_time = now
 
@@ -413,8 +713,10 @@ class CombinedService:
                     if self.sender.sequence_number % 60 == 0:  # Every minute
                         logger.info(f"Stats: {self.sender.get_stats()}")
 
-                # Small sleep to avoid busy-waiting
-                time.sleep(0.1)
+                # Sleep until the next send or hour boundary, whichever is first
+                deadline = min(self.last_send_time + self.send_interval, self.logger.next_rotation_time)
+                if STOP.wait(timeout=max(0.0, deadline - time.time())):
+                    break
 
         except KeyboardInterrupt:
             logger.info("Interrupted by user")
@@ -430,9 +732,13 @@ class CombinedService:
         # Stop reader
         self.reader.stop()
 
-        # Close log files
+        # Close log files and archive the current hour, then give up on
+        # the network; both waits are bounded (see COMPRESS_SHUTDOWN_TIMEOUT)
         self.logger.close()
 
+        # Stop sending
+        self.sender.close()
+
         # Final stats
         logger.info(f"Final stats: {self.sender.get_stats()}")
         logger.info("Service stopped")
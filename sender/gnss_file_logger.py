@@ -15,19 +15,25 @@ Logger is resilient to restarts and clock drift,
 and never overwrites existing files.
 
 Requirements:
-  apt install zstd
-  pip install pyserial pyubx2 pynmea2
+  pip install pyserial pyubx2 pynmea2 zstandard
 """
 
+import io
 import os
 import sys
 import time
 import errno
 import signal
-import subprocess
+import threading
 from datetime import datetime, timezone, timedelta
 import serial
 from pyubx2 import UBXReader
+from archive_io import build_compressor, compress_and_checksum
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # configurable via environment
 ROOT = os.getenv("GNSS_ROOT", "/data/gnss")
@@ -35,33 +41,67 @@ PORT = os.getenv("GNSS_PORT", "/dev/ttyGPS_logger")
 BAUD = int(os.getenv("GNSS_BAUD", "115200"))
 FSYNC_INTERVAL_BYTES = 1_000_000   # fsync after about one megabyte written
 PRINT_EVERY_SEC = 10               # status line interval
+ZSTD_LEVEL = int(os.getenv("GNSS_ZSTD_LEVEL", "9"))
+ZSTD_DICT = os.getenv("GNSS_ZSTD_DICT", "")  # trained dictionary, opt-in (needed to decompress)
+READ_BUFFER_BYTES = 8192           # userspace buffer between the port and UBXReader
 
-STOP = False
+STOP = threading.Event()
+_last_day_dir = None               # last directory created by path_for
+_cctx = None                       # zstd compressor, built on first use
 
 def sigterm(_n, _f):
-    global STOP
-    STOP = True
+    STOP.set()
 
 signal.signal(signal.SIGINT, sigterm)
 signal.signal(signal.SIGTERM, sigterm)
 
+class SerialDrain(io.RawIOBase):
+    """
+    Raw stream over a serial port that hands back everything already
+    received in one read, blocking only until the first byte arrives.
+    Wrapped in io.BufferedReader so UBXReader's small header/payload
+    reads are served from memory instead of one syscall each.
+    """
+
+    def __init__(self, ser):
+        self.ser = ser
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self.ser.read(min(len(b), self.ser.in_waiting or 1))
+        n = len(data)
+        b[:n] = data
+        return n
+
 def ensure_dir(path: str):
     os.makedirs(path, exist_ok=True)
 
+def get_compressor():
+    """zstd compressor for the hourly archives, built on first use"""
+    global _cctx
+    if _cctx is None:
+        _cctx = build_compressor(ZSTD_LEVEL, ZSTD_DICT)
+    return _cctx
+
 def path_for(dt: datetime):
+    global _last_day_dir
     day_dir = os.path.join(ROOT, dt.strftime("%Y"), dt.strftime("%m"), dt.strftime("%d"))
-    ensure_dir(day_dir)
+    # only hit the filesystem when the day changes
+    if day_dir != _last_day_dir:
+        ensure_dir(day_dir)
+        _last_day_dir = day_dir
     base = os.path.join(day_dir, dt.strftime("%H"))
     return base + ".nmea", base + ".ubx"
 
 def atomic_compress_and_checksum(src_path: str):
     """
-    Compress src_path to src_path.zst.tmp, compute sha256,
-    then atomically rename to .zst and .zst.sha256.
+    Compress src_path to src_path.zst, computing sha256 in the same pass,
+    publish it atomically, then write .zst.sha256 via temp file and rename.
     Leaves original src_path in place until both artifacts are durable,
     then removes it to reclaim space.
     """
-    zst_tmp = src_path + ".zst.tmp"
     zst_final = src_path + ".zst"
     sha_final = src_path + ".zst.sha256"
 
@@ -69,42 +109,13 @@ def atomic_compress_and_checksum(src_path: str):
         # done previously
         return
 
-    # compress, multi thread if available
-    try:
-        subprocess.run(
-            ["zstd", "-q", "-T0", "-19", "-f", "-o", zst_tmp, src_path],
-            check=True,
-        )
-    except FileNotFoundError:
-        # zstd missing
-        print("zstd not found, please install it, apt install zstd", file=sys.stderr)
+    if zstandard is None:
+        # python binding missing
+        print("zstandard not found, please install it, pip install zstandard", file=sys.stderr)
         return
-    os.sync()
-
-    # checksum
-    sha_out = subprocess.run(
-        ["sha256sum", os.path.basename(zst_tmp)],
-        check=True,
-        cwd=os.path.dirname(zst_tmp),
-        capture_output=True,
-        text=True,
-    ).stdout
-    # write checksum to temp then move
-    sha_tmp = sha_final + ".tmp"
-    with open(sha_tmp, "w", encoding="utf-8") as f:
-        f.write(sha_out)
-        f.flush()
-        os.fsync(f.fileno())
-
-    # finalize
-    os.replace(zst_tmp, zst_final)
-    os.replace(sha_tmp, sha_final)
-
-    # remove original uncompressed file
-    try:
-        os.remove(src_path)
-    except FileNotFoundError:
-        pass
+
+    # compress on all cores, checksum computed in the same pass
+    compress_and_checksum(get_compressor(), src_path)
 
 def rotate_previous_hour(now: datetime):
     """
@@ -142,7 +153,8 @@ def fsync_if_needed(fh, counter, threshold):
 def main():
     ensure_dir(ROOT)
     ser = serial.Serial(PORT, BAUD, timeout=1)
-    ubr = UBXReader(ser, protfilter=7)  # NMEA, UBX, RTCM
+    stream = io.BufferedReader(SerialDrain(ser), buffer_size=READ_BUFFER_BYTES)
+    ubr = UBXReader(stream, protfilter=7)  # NMEA, UBX, RTCM
     current_hour = None
     nmea_path = ubx_path = None
     nfh = ufh = None
@@ -171,7 +183,7 @@ def main():
     # attempt compression of the previous hour if any uncompressed files exist
     rotate_previous_hour(now)
 
-    while not STOP:
+    while not STOP.is_set():
         try:
             raw, msg = next(ubr)
         except Exception:
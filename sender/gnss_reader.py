@@ -6,10 +6,21 @@ Reads raw NMEA and UBX data from a GNSS receiver via serial connection.
 Buffers data for batch transmission to central server.
 """
 
+import os
 import time
+import select
+import signal
+import asyncio
+import struct
 import logging
 import threading
-from typing import List, Tuple, Optional
+import multiprocessing
+from functools import reduce
+from itertools import accumulate
+from operator import xor
+from queue import Empty
+from collections import deque
+from typing import Deque, List, Tuple, Optional
 import base64
 
 try:
@@ -17,8 +28,19 @@ try:
 except ImportError:
     serial = None
 
+try:
+    import serial_asyncio
+except ImportError:
+    serial_asyncio = None
+
 logger = logging.getLogger(__name__)
 
+# Length prefix for framing raw UBX messages in a binary blob
+UBX_FRAME_LEN = struct.Struct('<I')
+
+# UBX payload length field (little-endian uint16 at offset 4)
+_U16LE = struct.Struct('<H').unpack_from
+
 
 class GNSSReader:
     """
@@ -29,6 +51,7 @@ class GNSSReader:
     # UBX message header
     UBX_SYNC_CHAR_1 = 0xB5
     UBX_SYNC_CHAR_2 = 0x62
+    UBX_SYNC = bytes((UBX_SYNC_CHAR_1, UBX_SYNC_CHAR_2))
 
     def __init__(self, device: str, baud_rate: int = 115200):
         """
@@ -47,19 +70,20 @@ class GNSSReader:
         self.running = False
         self.reader_thread: Optional[threading.Thread] = None
 
-        # Output buffers (thread-safe)
-        self.nmea_buffer: List[str] = []
-        self.ubx_buffer: List[bytes] = []
-        self.buffer_lock = threading.Lock()
+        # Raw fd polling (POSIX): pyserial only configures the port
+        self.serial_fd: Optional[int] = None
+        self.poller = None
 
-        # Parser state for NMEA
-        self.nmea_line_buffer = bytearray()
+        # Output buffers: single producer (reader thread), single consumer.
+        # deque append/popleft are atomic in CPython, so no lock is needed
+        self.nmea_buffer: Deque[str] = deque()
+        self.ubx_buffer: Deque[bytes] = deque()
 
-        # Parser state for UBX
-        self.ubx_partial_buffer = bytearray()
-
-        # State machine
-        self.parsing_state = 'SEARCHING'  # SEARCHING, IN_NMEA, IN_UBX
+        # Parser state: receive buffer and scan position. Consumed bytes are
+        # only dropped once rx_pos passes the threshold, not on every read
+        self.rx = bytearray()
+        self.rx_pos = 0
+        self.rx_compact_threshold = 8192
 
         # Safety limits
         self.max_nmea_line_length = 512  # Max NMEA sentence length
@@ -77,13 +101,26 @@ class GNSSReader:
             self.serial_conn = serial.Serial(
                 port=self.device,
                 baudrate=self.baud_rate,
-                timeout=1.0,
+                timeout=0.05,  # A read returns at most 50ms after data starts arriving
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
             )
             logger.info(f"Connected to GNSS device: {self.device}")
 
+            # Read straight from the fd where the platform allows it,
+            # skipping pyserial's Python-level read/timeout loop
+            self.serial_fd = None
+            self.poller = None
+            if hasattr(select, "poll"):
+                try:
+                    self.serial_fd = self.serial_conn.fileno()
+                    self.poller = select.poll()
+                    self.poller.register(self.serial_fd, select.POLLIN)
+                except (AttributeError, OSError):
+                    self.serial_fd = None
+                    self.poller = None
+
             # Detect potential port sharing
             time.sleep(0.2)  # Let data accumulate
             if self.serial_conn.in_waiting == 0:
@@ -142,13 +179,25 @@ class GNSSReader:
 
         while self.running and self.serial_conn and self.serial_conn.is_open:
             try:
-                # Read available data
-                if self.serial_conn.in_waiting > 0:
-                    data = self.serial_conn.read(self.serial_conn.in_waiting)
-                    self._process_data(data)
-                    consecutive_errors = 0  # Reset on successful read
+                if self.poller is not None:
+                    # Sleep in poll() until the fd is readable, then one read() syscall
+                    if not self.poller.poll(500):
+                        continue  # No data within 500ms
+                    data = os.read(self.serial_fd, 4096)
+                    if not data:
+                        raise serial.SerialException(
+                            "device reports readiness to read but returned no data "
+                            "(device disconnected or multiple access on port?)"
+                        )
                 else:
-                    time.sleep(0.01)  # Small delay if no data
+                    # One blocking read: returns when 4 KB arrived or the port
+                    # timeout expires, coalescing bytes without in_waiting ioctls
+                    data = self.serial_conn.read(4096)
+                    if not data:
+                        continue  # Read timed out with no data
+
+                self._process_data(data)
+                consecutive_errors = 0  # Reset on successful read
 
             except serial.SerialException as e:
                 consecutive_errors += 1
@@ -174,9 +223,11 @@ class GNSSReader:
 
     def _process_data(self, data: bytes):
         """
-        Process incoming data with proper state machine to separate NMEA from UBX.
+        Process incoming data, separating NMEA sentences from UBX messages.
 
-        This method uses a state machine to correctly handle:
+        Incoming bytes are appended to a single receive buffer which is then
+        scanned for frame starts with bytes.find (memchr) rather than byte by
+        byte. This correctly handles:
         - Mixed NMEA/UBX streams
         - Incomplete messages across read boundaries
         - Data corruption and recovery
@@ -184,222 +235,228 @@ class GNSSReader:
         Args:
             data: Raw bytes from serial port
         """
-        # Prepend any partial UBX data from previous read
-        if self.ubx_partial_buffer:
-            data = self.ubx_partial_buffer + data
-            self.ubx_partial_buffer.clear()
-
-        i = 0
-        while i < len(data):
-            byte = data[i]
-
-            # STATE: SEARCHING - looking for message start
-            if self.parsing_state == 'SEARCHING':
-                # Check for UBX sync bytes
-                if byte == self.UBX_SYNC_CHAR_1:
-                    if i + 1 < len(data) and data[i + 1] == self.UBX_SYNC_CHAR_2:
-                        # Found UBX start - try to extract complete message
-                        self.ubx_partial_buffer = bytearray(data[i:])
-
-                        # Check if we have enough bytes to validate the length field
-                        if len(self.ubx_partial_buffer) >= 6:
-                            # Parse length (bytes 4-5)
-                            length = self.ubx_partial_buffer[4] | (self.ubx_partial_buffer[5] << 8)
-
-                            # Check for obviously invalid length
-                            if length > self.max_ubx_message_length:
-                                self.ubx_error_count += 1
-                                logger.warning(
-                                    f"UBX message too large: {length} bytes (max {self.max_ubx_message_length}), "
-                                    f"skipping sync bytes (error count: {self.ubx_error_count})"
-                                )
-
-                                # If we've seen too many errors, force aggressive resync
-                                if self.ubx_error_count >= self.max_ubx_errors_before_resync:
-                                    logger.error(
-                                        f"UBX parser stuck after {self.ubx_error_count} consecutive errors. "
-                                        f"Forcing resync by clearing all buffers."
-                                    )
-                                    self.ubx_partial_buffer.clear()
-                                    self.ubx_error_count = 0
-                                else:
-                                    self.ubx_partial_buffer.clear()
-
-                                # Skip these 2 sync bytes and continue searching
-                                i += 2
-                                continue
-
-                        ubx_msg = self._extract_ubx_message(self.ubx_partial_buffer)
-                        if ubx_msg:
-                            # Complete message - buffer it
-                            with self.buffer_lock:
-                                self.ubx_buffer.append(ubx_msg)
-
-                            # Reset error count on successful parse
-                            self.ubx_error_count = 0
-
-                            # Advance past this message
-                            bytes_consumed = len(ubx_msg)
-                            i += bytes_consumed
-                            self.ubx_partial_buffer.clear()
-                            # Stay in SEARCHING state
-                            continue
-                        else:
-                            # Incomplete message - save remainder for next read
-                            # Will be prepended in next call
-                            # Stay in SEARCHING state (important!)
-                            break
-
-                # Check for NMEA start
-                elif byte == ord('$'):
-                    self.parsing_state = 'IN_NMEA'
-                    self.nmea_line_buffer.clear()
-                    self.nmea_line_buffer.append(byte)
-
-                # Ignore other bytes while searching
-                i += 1
-
-            # STATE: IN_NMEA - building NMEA sentence
-            elif self.parsing_state == 'IN_NMEA':
-                self.nmea_line_buffer.append(byte)
-
-                # Check for end of line
-                if byte == ord('\n'):
-                    # Complete NMEA line
-                    try:
-                        nmea_line = self.nmea_line_buffer.decode('ascii').strip()
+        rx = self.rx
+        rx.extend(data)
+        pos = self.rx_pos
+        size = len(rx)
+
+        # Hot-loop locals: no attribute lookups per message
+        find = rx.find
+        sync = self.UBX_SYNC
+        max_ubx = self.max_ubx_message_length
+        max_nmea = self.max_nmea_line_length
+        ubx_append = self.ubx_buffer.append
+        nmea_append = self.nmea_buffer.append
+        ubx_i = nmea_i = -2  # not searched yet
+
+        while pos < size:
+            # Next frame start of either kind (rescan only once passed)
+            if ubx_i != -1 and ubx_i < pos:
+                ubx_i = find(sync, pos)
+            if nmea_i != -1 and nmea_i < pos:
+                nmea_i = find(b'$', pos)
+
+            if ubx_i == -1 and nmea_i == -1:
+                # Nothing left but noise; keep a trailing first sync byte
+                pos = size - 1 if rx[-1] == self.UBX_SYNC_CHAR_1 else size
+                break
+
+            # UBX frame comes first
+            if nmea_i == -1 or (ubx_i != -1 and ubx_i < nmea_i):
+                pos = ubx_i
+
+                # Need the length field before anything else
+                if ubx_i + 6 > size:
+                    break
 
-                        # Validate it looks like NMEA
-                        if nmea_line.startswith('$') and len(nmea_line) > 5:
-                            # Optional: validate checksum
-                            if self._validate_nmea_checksum(nmea_line):
-                                with self.buffer_lock:
-                                    self.nmea_buffer.append(nmea_line)
-                            else:
-                                logger.debug(f"NMEA checksum failed: {nmea_line[:20]}...")
+                length = _U16LE(rx, ubx_i + 4)[0]
+
+                # Check for obviously invalid length
+                if length > max_ubx:
+                    self.ubx_error_count += 1
+                    logger.warning(
+                        "UBX message too large: %d bytes (max %d), "
+                        "skipping sync bytes (error count: %d)",
+                        length, max_ubx, self.ubx_error_count
+                    )
+                    self._check_ubx_resync()
+                    # Skip these 2 sync bytes and continue searching
+                    pos = ubx_i + 2
+                    continue
 
-                    except UnicodeDecodeError as e:
-                        logger.warning(f"Failed to decode NMEA line (corrupted data), resyncing")
+                # Total message size = header(2) + class(1) + id(1) + length(2) + payload + checksum(2)
+                total_size = 6 + length + 2
+                if ubx_i + total_size > size:
+                    break  # Incomplete message, wait for more data
+
+                ubx_msg = bytes(rx[ubx_i:ubx_i + total_size])
+                if not self._validate_ubx_checksum(ubx_msg):
+                    self.ubx_error_count += 1
+                    logger.warning("UBX message failed checksum validation, skipping")
+                    self._check_ubx_resync()
+                    pos = ubx_i + 2
+                    continue
 
-                    # Reset state
-                    self.nmea_line_buffer.clear()
-                    self.parsing_state = 'SEARCHING'
+                # Complete message - buffer it
+                ubx_append(ubx_msg)
 
-                # Check for buffer overflow protection
-                elif len(self.nmea_line_buffer) > self.max_nmea_line_length:
-                    logger.warning(f"NMEA line too long ({len(self.nmea_line_buffer)} bytes), discarding")
-                    self.nmea_line_buffer.clear()
-                    self.parsing_state = 'SEARCHING'
+                # Reset error count on successful parse
+                self.ubx_error_count = 0
+                pos = ubx_i + total_size
+                continue
 
-                # Check for unexpected UBX sync in middle of NMEA
-                elif byte == self.UBX_SYNC_CHAR_1 and i + 1 < len(data) and data[i + 1] == self.UBX_SYNC_CHAR_2:
+            # NMEA sentence comes first
+            pos = nmea_i
+            end = find(b'\n', nmea_i + 1, nmea_i + max_nmea + 1)
+
+            # Check for unexpected UBX sync in middle of NMEA
+            if ubx_i != -1 and (end == -1 or ubx_i < end):
+                if ubx_i - nmea_i <= max_nmea:
                     # Data corruption detected - UBX in NMEA stream
                     logger.warning("Data corruption: UBX bytes in NMEA stream, resyncing")
-                    self.nmea_line_buffer.clear()
-                    self.parsing_state = 'SEARCHING'
-                    # Don't increment i, let next iteration process UBX
+                    pos = ubx_i
                     continue
 
-                i += 1
+            if end == -1:
+                # Check for buffer overflow protection
+                if size - nmea_i > max_nmea:
+                    logger.warning("NMEA line too long (>%d bytes), discarding", max_nmea)
+                    pos = nmea_i + max_nmea + 1
+                    continue
+                break  # Incomplete line, wait for more data
 
-            # Unknown state - should never happen
-            else:
-                logger.error(f"BUG: Unknown parsing state: {self.parsing_state}, resetting to SEARCHING")
-                self.parsing_state = 'SEARCHING'
-                self.nmea_line_buffer.clear()
-                self.ubx_partial_buffer.clear()
-                i += 1
+            pos = end + 1
+
+            # Complete NMEA line: validate the raw bytes, decode only once it passes
+            nmea_raw = rx[nmea_i:end].strip()
+
+            # Validate it looks like NMEA
+            if len(nmea_raw) > 5:
+                if self._validate_nmea_checksum_bytes(nmea_raw):
+                    try:
+                        nmea_append(nmea_raw.decode('ascii'))
+                    except UnicodeDecodeError:
+                        logger.warning("Failed to decode NMEA line (corrupted data), resyncing")
+                elif logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("NMEA checksum failed: %s...", nmea_raw[:20].decode("ascii", "replace"))
+
+        # Drop consumed bytes (amortised)
+        if pos >= len(rx):
+            rx.clear()
+            pos = 0
+        elif pos > self.rx_compact_threshold:
+            del rx[:pos]
+            pos = 0
+        self.rx_pos = pos
+
+    def _check_ubx_resync(self):
+        """Log and reset once too many consecutive UBX errors have been seen."""
+        if self.ubx_error_count >= self.max_ubx_errors_before_resync:
+            logger.error(
+                "UBX parser stuck after %d consecutive errors. Forcing resync.",
+                self.ubx_error_count
+            )
+            self.ubx_error_count = 0
 
-    def _validate_nmea_checksum(self, nmea_line: str) -> bool:
+    def _validate_nmea_checksum_bytes(self, raw: bytes) -> bool:
         """
-        Validate NMEA sentence checksum.
+        Validate NMEA sentence checksum on the undecoded line.
 
         Args:
-            nmea_line: NMEA sentence (with or without checksum)
+            raw: NMEA sentence bytes (with or without checksum)
 
         Returns:
             True if valid or no checksum present, False if invalid
         """
-        if '*' not in nmea_line:
+        star = raw.rfind(b'*')
+        if star == -1:
             return True  # No checksum to validate
 
         try:
-            sentence, checksum = nmea_line.split('*')
-            sentence = sentence.lstrip('$')
-
-            # Calculate checksum
-            calc_checksum = 0
-            for char in sentence:
-                calc_checksum ^= ord(char)
+            # XOR of every byte between '$' and '*', reduced in one C-level
+            # pass over a view of the line (no copy)
+            start = 1 if raw.startswith(b'$') else 0
+            calc_checksum = reduce(xor, memoryview(raw)[start:star], 0)
 
             # Compare
-            provided_checksum = int(checksum[:2], 16)  # Only first 2 hex chars
+            provided_checksum = int(raw[star + 1:star + 3], 16)  # Only first 2 hex chars
             return calc_checksum == provided_checksum
 
-        except Exception:
+        except ValueError:
             return False
 
-    def _extract_ubx_message(self, data: bytes) -> Optional[bytes]:
+    def _validate_ubx_checksum(self, message: bytes) -> bool:
         """
-        Extract a complete UBX message from data.
-        UBX format: 0xB5 0x62 [class] [id] [length_low] [length_high] [payload] [ck_a] [ck_b]
+        Validate UBX message checksum.
 
         Args:
-            data: Bytes starting with UBX header
+            message: Complete UBX message
 
         Returns:
-            Complete UBX message or None if incomplete
+            True if checksum valid, False otherwise
         """
-        if len(data) < 8:  # Minimum UBX message size
-            return None
+        if len(message) < 8:
+            return False
 
-        # Parse length (bytes 4-5)
-        length = data[4] | (data[5] << 8)
+        # Calculate checksum over class, id, length, and payload
+        # (skip header and checksum bytes). ck_a is the byte sum and ck_b the
+        # sum of the running ck_a values, both mod 256 - summed in C, not per byte
+        body = memoryview(message)[2:-2]
+        ck_a = sum(body) & 0xFF
+        ck_b = sum(accumulate(body)) & 0xFF
 
-        # Check for reasonable length (prevent buffer overflow)
-        # Note: This should be caught earlier in _process_serial_data, but double-check here
-        if length > self.max_ubx_message_length:
-            return None
+        # Compare with provided checksum
+        return message[-2] == ck_a and message[-1] == ck_b
 
-        # Total message size = header(2) + class(1) + id(1) + length(2) + payload + checksum(2)
-        total_size = 6 + length + 2
+    @staticmethod
+    def _drain(buffer: deque) -> list:
+        """
+        Pop everything currently in a buffer without taking a lock.
 
-        if len(data) < total_size:
-            return None  # Incomplete message
+        Args:
+            buffer: Output deque filled by the reader thread
 
-        # Extract message
-        message = data[:total_size]
+        Returns:
+            List of drained items, oldest first
+        """
+        items = []
+        while True:
+            try:
+                items.append(buffer.popleft())
+            except IndexError:
+                return items
 
-        # Validate checksum
-        if not self._validate_ubx_checksum(message):
-            logger.warning("UBX message failed checksum validation, skipping")
-            return None
+    def get_buffered_raw_data(self) -> Tuple[List[str], List[bytes]]:
+        """
+        Get and clear current buffered data without encoding UBX.
 
-        return message
+        Returns:
+            Tuple of (nmea_lines, ubx_messages_raw)
+            - nmea_lines: List of raw NMEA strings
+            - ubx_messages_raw: List of raw UBX message bytes
+        """
+        return self._drain(self.nmea_buffer), self._drain(self.ubx_buffer)
 
-    def _validate_ubx_checksum(self, message: bytes) -> bool:
+    def get_buffered_data_binary(self) -> Tuple[List[str], bytes]:
         """
-        Validate UBX message checksum.
+        Get and clear current buffered data with UBX framed as one binary blob.
 
-        Args:
-            message: Complete UBX message
+        Each UBX message is preceded by its length as a little-endian uint32,
+        for transports that carry raw bytes (no base64 inflation or encoding).
 
         Returns:
-            True if checksum valid, False otherwise
+            Tuple of (nmea_lines, ubx_blob)
+            - nmea_lines: List of raw NMEA strings
+            - ubx_blob: Length-prefixed concatenation of raw UBX messages
         """
-        if len(message) < 8:
-            return False
-
-        # Calculate checksum over class, id, length, and payload
-        ck_a = 0
-        ck_b = 0
+        nmea_lines, ubx_raw = self.get_buffered_raw_data()
 
-        for byte in message[2:-2]:  # Skip header and checksum bytes
-            ck_a = (ck_a + byte) & 0xFF
-            ck_b = (ck_b + ck_a) & 0xFF
+        out = bytearray()
+        for msg in ubx_raw:
+            out += UBX_FRAME_LEN.pack(len(msg))
+            out += msg
 
-        # Compare with provided checksum
-        return message[-2] == ck_a and message[-1] == ck_b
+        return nmea_lines, bytes(out)
 
     def get_buffered_data(self) -> Tuple[List[str], List[str]]:
         """
@@ -410,14 +467,8 @@ class GNSSReader:
             - nmea_lines: List of raw NMEA strings
             - ubx_messages_base64: List of base64-encoded UBX messages
         """
-        with self.buffer_lock:
-            # Copy buffers
-            nmea_lines = self.nmea_buffer.copy()
-            ubx_base64 = [base64.b64encode(msg).decode('ascii') for msg in self.ubx_buffer]
-
-            # Clear buffers
-            self.nmea_buffer.clear()
-            self.ubx_buffer.clear()
+        nmea_lines, ubx_raw = self.get_buffered_raw_data()
+        ubx_base64 = [base64.b64encode(msg).decode('ascii') for msg in ubx_raw]
 
         return nmea_lines, ubx_base64
 
@@ -431,14 +482,257 @@ class GNSSReader:
             - ubx_messages_base64: List of base64-encoded UBX messages
             - ubx_messages_raw: List of raw UBX message bytes
         """
-        with self.buffer_lock:
-            # Copy buffers
-            nmea_lines = self.nmea_buffer.copy()
-            ubx_raw = self.ubx_buffer.copy()
-            ubx_base64 = [base64.b64encode(msg).decode('ascii') for msg in ubx_raw]
-
-            # Clear buffers
-            self.nmea_buffer.clear()
-            self.ubx_buffer.clear()
+        nmea_lines, ubx_raw = self.get_buffered_raw_data()
+        ubx_base64 = [base64.b64encode(msg).decode('ascii') for msg in ubx_raw]
 
         return nmea_lines, ubx_base64, ubx_raw
+
+
+class _ForwardingReader(GNSSReader):
+    """
+    GNSSReader used inside the reader process: after each read, hands the
+    parsed messages to the parent over a queue instead of keeping them.
+    """
+
+    def __init__(self, device: str, baud_rate: int, queue):
+        super().__init__(device, baud_rate)
+        self.queue = queue
+
+    def _process_data(self, data: bytes):
+        super()._process_data(data)
+        nmea_lines, ubx_raw = self.get_buffered_raw_data()
+        if nmea_lines or ubx_raw:
+            self.queue.put((nmea_lines, ubx_raw))
+
+
+def _reader_process_main(device: str, baud_rate: int, queue, status_queue, stop_event):
+    """
+    Entry point of the reader process.
+
+    Args:
+        device: Serial device path
+        baud_rate: Baud rate for serial connection
+        queue: multiprocessing.Queue receiving (nmea_lines, ubx_raw) tuples
+        status_queue: multiprocessing.Queue receiving the connect result
+            (None on success, the error message on failure)
+        stop_event: multiprocessing.Event set by the parent to stop reading
+    """
+    # Ctrl+C goes to the whole process group; the parent decides when we stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    reader = _ForwardingReader(device, baud_rate, queue)
+    try:
+        reader.connect()
+    except Exception as e:
+        status_queue.put(str(e) or type(e).__name__)
+        return
+    status_queue.put(None)
+    reader.running = True
+
+    def wait_for_stop():
+        # Poll rather than stop_event.wait(): a process that dies while
+        # waiting on the Event's condition would make the parent's set() hang
+        while not stop_event.is_set():
+            time.sleep(0.2)
+        reader.running = False
+
+    threading.Thread(target=wait_for_stop, daemon=True).start()
+
+    try:
+        reader._read_loop()
+    finally:
+        reader.disconnect()
+        # Don't hang on exit flushing data the parent will never collect
+        queue.cancel_join_thread()
+
+
+class GNSSReaderProcess(GNSSReader):
+    """
+    GNSSReader variant that reads and parses the serial stream in a separate
+    process, so it has its own GIL and can't be starved by the sender's
+    encoding, compression or TLS work. Parsed messages come back over a
+    multiprocessing.Queue; the getters have the same interface.
+    """
+
+    def __init__(self, device: str, baud_rate: int = 115200):
+        """
+        Initialize process-backed GNSS reader.
+
+        Args:
+            device: Serial device path (e.g., /dev/ttyACM0, COM3)
+            baud_rate: Baud rate for serial connection
+        """
+        super().__init__(device, baud_rate)
+        self.queue = multiprocessing.Queue()
+        self.status_queue = multiprocessing.Queue()
+        self.stop_event = multiprocessing.Event()
+        self.connect_timeout = 10.0  # seconds to wait for the child to open the port
+        self.reader_process: Optional[multiprocessing.Process] = None
+
+    def start(self):
+        """Start reading data in a background process."""
+        if self.running:
+            logger.warning("Reader already running")
+            return
+
+        self.stop_event.clear()
+        self.reader_process = multiprocessing.Process(
+            target=_reader_process_main,
+            args=(self.device, self.baud_rate, self.queue, self.status_queue, self.stop_event),
+            name="gnss-reader",
+            daemon=True,
+        )
+        self.reader_process.start()
+        self.running = True
+
+        # Wait for the child to open the port, so a missing or busy device
+        # fails here just like GNSSReader.start()
+        deadline = time.time() + self.connect_timeout
+        while True:
+            try:
+                error = self.status_queue.get(timeout=0.2)
+                break
+            except Empty:
+                if not self.reader_process.is_alive():
+                    error = f"reader process exited with code {self.reader_process.exitcode}"
+                    break
+                if time.time() > deadline:
+                    error = f"no connect result from reader process after {self.connect_timeout:.0f}s"
+                    break
+
+        if error is not None:
+            self.stop()
+            raise serial.SerialException(f"Failed to connect to {self.device}: {error}")
+
+        logger.info(f"GNSS reader process started (pid {self.reader_process.pid})")
+
+    def stop(self):
+        """Stop the reader process."""
+        self.running = False
+        if self.reader_process:
+            self.stop_event.set()
+            self.reader_process.join(timeout=2.0)
+            if self.reader_process.is_alive():
+                logger.warning("Reader process did not exit, terminating")
+                self.reader_process.terminate()
+                self.reader_process.join(timeout=1.0)
+        logger.info("GNSS reader stopped")
+
+    def get_buffered_raw_data(self) -> Tuple[List[str], List[bytes]]:
+        """
+        Get and clear everything the reader process has forwarded so far.
+
+        Returns:
+            Tuple of (nmea_lines, ubx_messages_raw)
+            - nmea_lines: List of raw NMEA strings
+            - ubx_messages_raw: List of raw UBX message bytes
+
+        Raises:
+            RuntimeError: If the reader process has died and everything it
+                sent has already been collected
+        """
+        # Checked before draining, so whatever it sent before dying is returned first
+        alive = self.reader_process is not None and self.reader_process.is_alive()
+
+        nmea_lines: List[str] = []
+        ubx_raw: List[bytes] = []
+
+        while True:
+            try:
+                nmea, ubx = self.queue.get_nowait()
+            except Empty:
+                break
+            nmea_lines.extend(nmea)
+            ubx_raw.extend(ubx)
+
+        if self.running and not alive and not nmea_lines and not ubx_raw:
+            exitcode = self.reader_process.exitcode if self.reader_process else None
+            logger.error(f"GNSS reader process exited unexpectedly (code {exitcode})")
+            raise RuntimeError(f"GNSS reader process exited (code {exitcode})")
+
+        return nmea_lines, ubx_raw
+
+
+class GNSSReaderAsync(GNSSReader):
+    """
+    GNSSReader variant driven by an asyncio event loop instead of a thread.
+    The serial port is read through pyserial-asyncio (epoll on the fd), so
+    reading and parsing share one thread with an async consumer. start()
+    and stop() are coroutines; the getters stay synchronous since draining
+    the buffers never blocks.
+    """
+
+    def __init__(self, device: str, baud_rate: int = 115200):
+        """
+        Initialize asyncio GNSS reader.
+
+        Args:
+            device: Serial device path (e.g., /dev/ttyACM0, COM3)
+            baud_rate: Baud rate for serial connection
+        """
+        if serial_asyncio is None:
+            raise RuntimeError("pyserial-asyncio not installed. Install with: pip install pyserial-asyncio")
+
+        super().__init__(device, baud_rate)
+        self.stream_reader: Optional[asyncio.StreamReader] = None
+        self.stream_writer: Optional[asyncio.StreamWriter] = None
+        self.read_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Open the device and start reading on the running event loop."""
+        if self.running:
+            logger.warning("Reader already running")
+            return
+
+        try:
+            self.stream_reader, self.stream_writer = await serial_asyncio.open_serial_connection(
+                url=self.device,
+                baudrate=self.baud_rate,
+            )
+        except serial.SerialException as e:
+            logger.error(f"Failed to connect to {self.device}: {e}")
+            raise
+        logger.info(f"Connected to GNSS device: {self.device}")
+
+        self.running = True
+        self.read_task = asyncio.create_task(self._read_loop())
+        logger.info("GNSS reader started")
+
+    async def stop(self):
+        """Stop reading and close the device."""
+        self.running = False
+        if self.read_task:
+            self.read_task.cancel()
+            try:
+                await self.read_task
+            except asyncio.CancelledError:
+                pass
+        if self.stream_writer:
+            self.stream_writer.close()
+            logger.info("Disconnected from GNSS device")
+        logger.info("GNSS reader stopped")
+
+    async def _read_loop(self):
+        """
+        Main reading loop - runs as a task on the event loop.
+        """
+        logger.info("Serial reader loop started")
+
+        while self.running:
+            try:
+                # Wakes as soon as the port has data, returns up to 4 KB
+                data = await self.stream_reader.read(4096)
+            except (serial.SerialException, OSError) as e:
+                logger.error(f"Serial read error, stopping reader: {e}")
+                break
+
+            if not data:
+                logger.error("Serial port closed, stopping reader")
+                break
+
+            try:
+                self._process_data(data)
+            except Exception as e:
+                logger.error(f"Unexpected error processing serial data: {e}", exc_info=True)
+
+        logger.info("Serial reader loop ended")
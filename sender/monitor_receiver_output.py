@@ -17,6 +17,11 @@ from datetime import datetime
 # UBX Protocol Constants
 UBX_SYNC_1 = 0xB5
 UBX_SYNC_2 = 0x62
+UBX_SYNC = bytes((UBX_SYNC_1, UBX_SYNC_2))
+_U16LE = struct.Struct('<H').unpack_from  # UBX length field
+
+# Drop consumed bytes from the receive buffer only past this many
+BUFFER_COMPACT_THRESHOLD = 8192
 
 # Message name mappings
 UBX_MESSAGES = {
@@ -73,83 +78,99 @@ class StreamMonitor:
         self.baudrate = baudrate
         self.duration = duration
 
+        # Counters keyed without per-message tuples: NMEA by the raw message ID
+        # (b'GNGGA'), UBX by (msg_class << 8) | msg_id
         self.nmea_counts = defaultdict(int)
         self.ubx_counts = defaultdict(int)
-        self.ubx_sizes = defaultdict(list)
+        self.ubx_size_sum = defaultdict(int)
+        self.ubx_size_max = defaultdict(int)
 
         self.buffer = bytearray()
-        self.nmea_buffer = bytearray()
+        self.buffer_pos = 0
 
     def parse_nmea(self, line: bytes):
         """Parse and count NMEA sentence"""
-        try:
-            line_str = line.decode('ascii', errors='ignore').strip()
-            if line_str.startswith('$'):
-                # Extract talker and sentence type
-                # Format: $GNGGA,... or $GPGGA,...
-                parts = line_str[1:].split(',')
-                if parts:
-                    msg_id = parts[0]
-                    if len(msg_id) >= 5:
-                        talker = msg_id[:2]
-                        sentence = msg_id[2:]
-                        self.nmea_counts[(talker, sentence)] += 1
-        except Exception:
-            pass
+        if line.startswith(b'$'):
+            # Extract talker and sentence type from the first field only
+            # Format: $GNGGA,... or $GPGGA,...
+            comma = line.find(b',')
+            if comma == -1:
+                comma = len(line.rstrip())
+            if comma >= 6:
+                self.nmea_counts[line[1:comma]] += 1
 
     def parse_ubx(self, data: bytes):
         """Parse and count UBX message"""
         if len(data) < 8:
             return
 
-        msg_class = data[2]
-        msg_id = data[3]
-        length = struct.unpack('<H', data[4:6])[0]
+        key = (data[2] << 8) | data[3]  # (msg_class, msg_id) packed in one int
+        total = _U16LE(data, 4)[0] + 8  # Total message size
 
-        self.ubx_counts[(msg_class, msg_id)] += 1
-        self.ubx_sizes[(msg_class, msg_id)].append(length + 8)  # Total message size
+        self.ubx_counts[key] += 1
+        self.ubx_size_sum[key] += total
+        if total > self.ubx_size_max[key]:
+            self.ubx_size_max[key] = total
 
     def process_data(self, data: bytes):
         """Process incoming serial data"""
-        self.buffer.extend(data)
-
-        i = 0
-        while i < len(self.buffer):
-            # Look for UBX sync bytes
-            if i < len(self.buffer) - 1 and self.buffer[i] == UBX_SYNC_1 and self.buffer[i+1] == UBX_SYNC_2:
-                # Found UBX message
-                if i + 6 <= len(self.buffer):
-                    length = struct.unpack('<H', self.buffer[i+4:i+6])[0]
-                    total_size = 6 + length + 2
-
-                    if i + total_size <= len(self.buffer):
-                        # Complete UBX message
-                        ubx_msg = bytes(self.buffer[i:i+total_size])
-                        self.parse_ubx(ubx_msg)
-                        i += total_size
-                        continue
-
-                # Incomplete UBX message, wait for more data
+        buf = self.buffer
+        buf.extend(data)
+
+        i = self.buffer_pos
+        size = len(buf)
+        ubx_i = nmea_i = -2  # not searched yet
+
+        # Hot-loop locals: no attribute lookups per message
+        find = buf.find
+        parse_ubx = self.parse_ubx
+        parse_nmea = self.parse_nmea
+
+        while i < size:
+            # Find the next UBX sync and NMEA start with C-level scans,
+            # re-scanning only once the position has moved past them
+            if ubx_i != -1 and ubx_i < i:
+                ubx_i = find(UBX_SYNC, i)
+            if nmea_i != -1 and nmea_i < i:
+                nmea_i = find(b'$', i)
+
+            if ubx_i == -1 and nmea_i == -1:
+                # No message start left; keep a trailing first sync byte
+                i = size - 1 if buf[-1] == UBX_SYNC_1 else size
                 break
 
-            # Look for NMEA sentences
-            if self.buffer[i] == ord('$'):
-                # Look for end of line
-                end = self.buffer.find(b'\n', i)
-                if end != -1:
-                    nmea_line = bytes(self.buffer[i:end])
-                    self.parse_nmea(nmea_line)
-                    i = end + 1
-                    continue
-                else:
-                    # Incomplete NMEA, wait for more data
-                    break
-
-            # Skip byte
-            i += 1
-
-        # Keep remaining data
-        self.buffer = self.buffer[i:]
+            if nmea_i == -1 or (ubx_i != -1 and ubx_i < nmea_i):
+                # Found UBX message
+                i = ubx_i
+                if i + 6 > size:
+                    break  # Incomplete header, wait for more data
+
+                length = _U16LE(buf, i + 4)[0]
+                total_size = 6 + length + 2
+                if i + total_size > size:
+                    break  # Incomplete UBX message, wait for more data
+
+                parse_ubx(bytes(buf[i:i + total_size]))
+                i += total_size
+                continue
+
+            # Found NMEA sentence, look for end of line
+            i = nmea_i
+            end = find(b'\n', i)
+            if end == -1:
+                break  # Incomplete NMEA, wait for more data
+
+            parse_nmea(bytes(buf[i:end]))
+            i = end + 1
+
+        # Keep remaining data, compacting in place only once enough is consumed
+        if i >= len(buf):
+            buf.clear()
+            i = 0
+        elif i > BUFFER_COMPACT_THRESHOLD:
+            del buf[:i]
+            i = 0
+        self.buffer_pos = i
 
     def monitor(self):
         """Monitor the serial stream"""
@@ -164,8 +185,12 @@ class StreamMonitor:
             last_update = start_time
 
             while time.time() - start_time < self.duration:
-                if ser.in_waiting > 0:
-                    data = ser.read(ser.in_waiting)
+                # Block (up to the 0.1s port timeout) for the first byte, then drain
+                data = ser.read(1)
+                if data:
+                    waiting = ser.in_waiting
+                    if waiting:
+                        data += ser.read(waiting)
                     self.process_data(data)
 
                 # Progress indicator
@@ -174,8 +199,6 @@ class StreamMonitor:
                     print(f"\rMonitoring... {elapsed:.0f}/{self.duration}s", end='', flush=True)
                     last_update = time.time()
 
-                time.sleep(0.01)
-
             print(f"\rMonitoring complete: {self.duration} seconds")
             print()
 
@@ -206,7 +229,10 @@ class StreamMonitor:
 
             critical_nmea = {'GGA', 'RMC', 'GSA', 'GSV', 'VTG'}
 
-            for (talker, sentence), count in sorted(self.nmea_counts.items()):
+            for msg_id, count in sorted(self.nmea_counts.items()):
+                msg_id = msg_id.decode('ascii', errors='ignore')
+                talker = msg_id[:2]
+                sentence = msg_id[2:]
                 rate = count / self.duration
                 constellation = NMEA_TALKERS.get(talker, 'Unknown')
                 sentence_desc = NMEA_SENTENCES.get(sentence, 'Unknown')
@@ -231,10 +257,11 @@ class StreamMonitor:
             print(f"{'Message':<50} {'Count':<10} {'Rate (Hz)':<12} {'Avg Size'}")
             print("-" * 80)
 
-            for (msg_class, msg_id), count in sorted(self.ubx_counts.items()):
+            for key, count in sorted(self.ubx_counts.items()):
+                msg_class, msg_id = key >> 8, key & 0xFF
                 rate = count / self.duration
-                avg_size = sum(self.ubx_sizes[(msg_class, msg_id)]) / len(self.ubx_sizes[(msg_class, msg_id)])
-                max_size = max(self.ubx_sizes[(msg_class, msg_id)])
+                avg_size = self.ubx_size_sum[key] / count
+                max_size = self.ubx_size_max[key]
 
                 msg_name = UBX_MESSAGES.get((msg_class, msg_id), f"UBX-{msg_class:02X}-{msg_id:02X} (Unknown)")
 
@@ -258,7 +285,7 @@ class StreamMonitor:
         missing_nmea = []
 
         for talker, sentence in required_nmea:
-            if (talker, sentence) not in self.nmea_counts:
+            if (talker + sentence).encode('ascii') not in self.nmea_counts:
                 missing_nmea.append(f"{talker}{sentence}")
                 critical_ok = False
 
@@ -270,7 +297,7 @@ class StreamMonitor:
         missing_ubx = []
 
         for msg_class, msg_id in required_ubx:
-            if (msg_class, msg_id) not in self.ubx_counts:
+            if (msg_class << 8) | msg_id not in self.ubx_counts:
                 missing_ubx.append(UBX_MESSAGES.get((msg_class, msg_id), f"UBX-{msg_class:02X}-{msg_id:02X}"))
                 critical_ok = False
 
@@ -299,8 +326,8 @@ class StreamMonitor:
 
         # Check for large messages
         print()
-        for (msg_class, msg_id), sizes in self.ubx_sizes.items():
-            max_size = max(sizes)
+        for key, max_size in self.ubx_size_max.items():
+            msg_class, msg_id = key >> 8, key & 0xFF
             if max_size > 2048:
                 msg_name = UBX_MESSAGES.get((msg_class, msg_id), f"UBX-{msg_class:02X}-{msg_id:02X}")
                 print(f"ℹ️  {msg_name} messages are large (max {max_size} bytes)")
@@ -6,15 +6,33 @@ This script queries the receiver for its active message configuration
 and displays which messages are enabled on each port.
 """
 
+import os
 import sys
 import time
+import select
 import serial
 import struct
-from typing import Dict, List, Tuple
+from contextlib import closing
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 # UBX Protocol Constants
 UBX_SYNC_1 = 0xB5
 UBX_SYNC_2 = 0x62
+UBX_SYNC = bytes((UBX_SYNC_1, UBX_SYNC_2))
+UBX_MAX_PAYLOAD = 4096  # Longer length fields are treated as a false sync
+
+# Sync + class + id of the responses we wait for, found with a single search
+_CFG_MSG_HEADER = bytes((UBX_SYNC_1, UBX_SYNC_2, 0x06, 0x01))
+_CFG_PRT_HEADER = bytes((UBX_SYNC_1, UBX_SYNC_2, 0x06, 0x00))
+_MON_VER_HEADER = bytes((UBX_SYNC_1, UBX_SYNC_2, 0x0A, 0x04))
+
+# Precompiled UBX field layouts
+_HDR = struct.Struct('<BBBBH')      # sync1, sync2, class, id, length
+_CLS_ID_LEN = struct.Struct('<BBH')  # class, id, length (checksummed header)
+_U8X2 = struct.Struct('<BB')         # ck_a/ck_b, or msgClass/msgID poll payload
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
 
 # UBX Message Classes
 UBX_CLASS_CFG = 0x06
@@ -56,6 +74,10 @@ MESSAGES_TO_CHECK = {
     (0x02, 0x59): "UBX-RXM-MEASX (Satellite measurements)",
 }
 
+# Report order (by name) and the messages flagged critical, fixed at load
+_SORTED_MESSAGES = sorted(MESSAGES_TO_CHECK.items(), key=lambda kv: kv[1])
+_CRITICAL = frozenset(name for name in MESSAGES_TO_CHECK.values() if 'CRITICAL' in name.upper())
+
 # Port names
 PORTS = {
     0: "DDC (I2C)",
@@ -66,26 +88,46 @@ PORTS = {
 }
 
 
-def calculate_checksum(msg_class: int, msg_id: int, payload: bytes) -> Tuple[int, int]:
-    """Calculate UBX checksum"""
-    ck_a = 0
-    ck_b = 0
+class PortConfig(NamedTuple):
+    """Port configuration decoded from a CFG-PRT response"""
+    port_id: int
+    baudrate: int
+    ubx_in: bool
+    nmea_in: bool
+    ubx_out: bool
+    nmea_out: bool
 
-    for byte in [msg_class, msg_id] + list(payload):
-        ck_a = (ck_a + byte) & 0xFF
-        ck_b = (ck_b + ck_a) & 0xFF
 
-    return ck_a, ck_b
+def calculate_checksum(msg_class: int, msg_id: int, payload: bytes) -> Tuple[int, int]:
+    """Calculate UBX checksum over class, id, length and payload"""
+    # ck_a is the byte sum, ck_b the sum of the running ck_a values (mod 256)
+    data = _CLS_ID_LEN.pack(msg_class, msg_id, len(payload)) + payload
+    return sum(data) & 0xFF, sum(accumulate(data)) & 0xFF
+
+
+# Checksums of the short poll messages, keyed by class + id + payload bytes.
+# Pre-filled with the CFG-MSG polls sent for MESSAGES_TO_CHECK.
+_CKSUM_CACHE_MAX_PAYLOAD = 2
+_CKSUM_CACHE: Dict[bytes, Tuple[int, int]] = {
+    bytes((0x06, 0x01, msg_class, msg_id)): calculate_checksum(0x06, 0x01, bytes((msg_class, msg_id)))
+    for msg_class, msg_id in MESSAGES_TO_CHECK
+}
 
 
 def build_ubx_message(msg_class: int, msg_id: int, payload: bytes = b'') -> bytes:
     """Build a complete UBX message"""
     length = len(payload)
-    msg = struct.pack('<BBBBH', UBX_SYNC_1, UBX_SYNC_2, msg_class, msg_id, length)
+    msg = _HDR.pack(UBX_SYNC_1, UBX_SYNC_2, msg_class, msg_id, length)
     msg += payload
 
-    ck_a, ck_b = calculate_checksum(msg_class, msg_id, payload)
-    msg += struct.pack('<BB', ck_a, ck_b)
+    if length <= _CKSUM_CACHE_MAX_PAYLOAD:
+        key = bytes((msg_class, msg_id)) + payload
+        ck = _CKSUM_CACHE.get(key)
+        if ck is None:
+            ck = _CKSUM_CACHE[key] = calculate_checksum(msg_class, msg_id, payload)
+    else:
+        ck = calculate_checksum(msg_class, msg_id, payload)
+    msg += _U8X2.pack(*ck)
 
     return msg
 
@@ -100,7 +142,7 @@ def parse_ubx_response(data: bytes) -> Tuple[int, int, bytes]:
 
     msg_class = data[2]
     msg_id = data[3]
-    length = struct.unpack('<H', data[4:6])[0]
+    length = _U16.unpack_from(data, 4)[0]
 
     if len(data) < 6 + length + 2:
         return None, None, None
@@ -110,88 +152,160 @@ def parse_ubx_response(data: bytes) -> Tuple[int, int, bytes]:
     return msg_class, msg_id, payload
 
 
-def query_message_rate(ser: serial.Serial, msg_class: int, msg_id: int) -> Dict[int, int]:
-    """Query the output rate of a specific message on all ports"""
-    # Build CFG-MSG poll request
-    payload = struct.pack('<BB', msg_class, msg_id)
-    msg = build_ubx_message(0x06, 0x01, payload)
+def _cstr(payload: bytes, size: int, offset: int = 0) -> str:
+    """Decode a NUL-padded fixed-size ASCII field from a UBX payload"""
+    end = offset + size
+    nul = payload.find(b'\x00', offset, end)
+    return payload[offset:end if nul < 0 else nul].decode('ascii', errors='ignore')
 
-    # Send query
-    ser.write(msg)
-    ser.flush()
 
-    # Wait for response (CFG-MSG with rates)
-    timeout = time.time() + 1.0
+def _iter_ubx_frames(ser: serial.Serial, deadline: float,
+                     header: bytes = UBX_SYNC) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Yield (class, id, payload) for every UBX frame starting with header
+    (sync bytes, optionally followed by class and id) read from the receiver
+    until the deadline passes. Close the generator to stop reading early.
+    """
     buffer = bytearray()
+    port_timeout = ser.timeout
+
+    # Read the port's fd directly when it has one: one select + one read
+    # per chunk instead of an in_waiting ioctl plus a pyserial read
+    try:
+        fd = ser.fileno()
+    except (AttributeError, OSError):
+        fd = None
+
+    try:
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+
+            # Block until data arrives (or the deadline), then take what's queued
+            if fd is not None:
+                if not select.select([fd], [], [], remaining)[0]:
+                    return  # Timed out
+                chunk = os.read(fd, 4096)
+            else:
+                ser.timeout = remaining
+                chunk = ser.read(max(1, ser.in_waiting))
+            if not chunk:
+                return  # Timed out, or the device went away
+            buffer.extend(chunk)
+
+            # Look for UBX frames, matching sync (+ class/id) with a C-level find
+            while True:
+                idx = buffer.find(header)
+                if idx < 0:
+                    # Nothing to parse; keep a tail that may start a header
+                    del buffer[:max(0, len(buffer) - len(header) + 1)]
+                    break
+                del buffer[:idx]
+
+                if len(buffer) >= 6 and _U16.unpack_from(buffer, 4)[0] > UBX_MAX_PAYLOAD:
+                    # Implausible length: false sync, skip it and keep looking
+                    del buffer[:2]
+                    continue
+
+                resp_class, resp_id, resp_payload = parse_ubx_response(buffer)
+                if resp_class is None:
+                    break  # Incomplete frame, wait for more data
+
+                # Drop the whole frame before handing it out
+                del buffer[:6 + len(resp_payload) + 2]
+
+                yield resp_class, resp_id, resp_payload
+    finally:
+        ser.timeout = port_timeout
+
+
+def _read_ubx_response(ser: serial.Serial, header: bytes,
+                       min_len: int = 1, timeout: float = 1.0) -> Optional[bytes]:
+    """
+    Read from the receiver until a UBX frame starting with header (sync,
+    class, id) with at least min_len payload bytes arrives. Returns its
+    payload, or None on timeout.
+    """
+    with closing(_iter_ubx_frames(ser, time.time() + timeout, header)) as frames:
+        for _, _, resp_payload in frames:
+            if len(resp_payload) >= min_len:
+                return bytes(resp_payload)
+
+    return None
+
+
+def _parse_message_rates(resp_payload: bytes) -> Dict[int, int]:
+    """Per-port output rates from a CFG-MSG response: msgClass, msgID, rate[6 ports]"""
+    rates = {}
+    for port in range(min(6, len(resp_payload) - 2)):
+        rate = resp_payload[2 + port]
+        if rate > 0:
+            rates[port] = rate
+    return rates
+
 
-    while time.time() < timeout:
-        if ser.in_waiting > 0:
-            buffer.extend(ser.read(ser.in_waiting))
+def query_message_rate(ser: serial.Serial, msg_class: int, msg_id: int) -> Dict[int, int]:
+    """Query the output rate of a specific message on all ports"""
+    return query_message_rates(ser, [(msg_class, msg_id)]).get((msg_class, msg_id), {})
 
-            # Look for UBX response
-            if len(buffer) >= 8:
-                for i in range(len(buffer) - 7):
-                    if buffer[i] == UBX_SYNC_1 and buffer[i+1] == UBX_SYNC_2:
-                        # Parse response
-                        resp_class, resp_id, resp_payload = parse_ubx_response(buffer[i:])
 
-                        if resp_class == 0x06 and resp_id == 0x01 and resp_payload:
-                            # CFG-MSG response format: msgClass, msgID, rate[6 ports]
-                            if len(resp_payload) >= 8:
-                                rates = {}
-                                for port in range(min(6, len(resp_payload) - 2)):
-                                    rate = resp_payload[2 + port]
-                                    if rate > 0:
-                                        rates[port] = rate
-                                return rates
+def query_message_rates(ser: serial.Serial, messages: Iterable[Tuple[int, int]],
+                        timeout: float = 2.0) -> Dict[Tuple[int, int], Dict[int, int]]:
+    """
+    Query the output rates of several messages at once.
+
+    All CFG-MSG polls go out in one write and the replies are matched back
+    to their message by the msgClass/msgID at the start of each payload.
+    Messages that got no reply before the timeout are left out.
+    """
+    pending = set(messages)
+    ser.write(b''.join(build_ubx_message(0x06, 0x01, _U8X2.pack(msg_class, msg_id))
+                       for msg_class, msg_id in pending))
+    ser.flush()
 
-                        buffer = buffer[i+8:]
-                        break
+    results = {}
+    with closing(_iter_ubx_frames(ser, time.time() + timeout, _CFG_MSG_HEADER)) as frames:
+        for _, _, resp_payload in frames:
+            if len(resp_payload) < 8:
+                continue
 
-        time.sleep(0.05)
+            key = (resp_payload[0], resp_payload[1])
+            if key in pending:
+                pending.discard(key)
+                results[key] = _parse_message_rates(resp_payload)
+                if not pending:
+                    break
 
-    return {}
+    return results
 
 
-def query_port_config(ser: serial.Serial, port_id: int) -> Dict:
+def query_port_config(ser: serial.Serial, port_id: int) -> Optional[PortConfig]:
     """Query port configuration (CFG-PRT)"""
-    payload = struct.pack('<B', port_id)
+    payload = bytes((port_id,))
     msg = build_ubx_message(0x06, 0x00, payload)
 
     ser.write(msg)
     ser.flush()
 
-    timeout = time.time() + 1.0
-    buffer = bytearray()
-
-    while time.time() < timeout:
-        if ser.in_waiting > 0:
-            buffer.extend(ser.read(ser.in_waiting))
-
-            if len(buffer) >= 20:
-                for i in range(len(buffer) - 19):
-                    if buffer[i] == UBX_SYNC_1 and buffer[i+1] == UBX_SYNC_2:
-                        resp_class, resp_id, resp_payload = parse_ubx_response(buffer[i:])
-
-                        if resp_class == 0x06 and resp_id == 0x00 and resp_payload and len(resp_payload) >= 20:
-                            # Parse port configuration
-                            port_id = resp_payload[0]
-                            baudrate = struct.unpack('<I', resp_payload[8:12])[0]
-                            in_proto_mask = struct.unpack('<H', resp_payload[12:14])[0]
-                            out_proto_mask = struct.unpack('<H', resp_payload[14:16])[0]
+    resp_payload = _read_ubx_response(ser, _CFG_PRT_HEADER, min_len=20)
+    if resp_payload is None:
+        return None
 
-                            return {
-                                'port_id': port_id,
-                                'baudrate': baudrate,
-                                'ubx_in': bool(in_proto_mask & 0x01),
-                                'nmea_in': bool(in_proto_mask & 0x02),
-                                'ubx_out': bool(out_proto_mask & 0x01),
-                                'nmea_out': bool(out_proto_mask & 0x02),
-                            }
+    # Parse port configuration
+    port_id = resp_payload[0]
+    baudrate = _U32.unpack_from(resp_payload, 8)[0]
+    in_proto_mask = _U16.unpack_from(resp_payload, 12)[0]
+    out_proto_mask = _U16.unpack_from(resp_payload, 14)[0]
 
-        time.sleep(0.05)
-
-    return {}
+    return PortConfig(
+        port_id=port_id,
+        baudrate=baudrate,
+        ubx_in=bool(in_proto_mask & 0x01),
+        nmea_in=bool(in_proto_mask & 0x02),
+        ubx_out=bool(out_proto_mask & 0x01),
+        nmea_out=bool(out_proto_mask & 0x02),
+    )
 
 
 def query_receiver_version(ser: serial.Serial) -> str:
@@ -201,26 +315,12 @@ def query_receiver_version(ser: serial.Serial) -> str:
     ser.write(msg)
     ser.flush()
 
-    timeout = time.time() + 1.0
-    buffer = bytearray()
-
-    while time.time() < timeout:
-        if ser.in_waiting > 0:
-            buffer.extend(ser.read(ser.in_waiting))
-
-            if len(buffer) >= 40:
-                for i in range(len(buffer) - 39):
-                    if buffer[i] == UBX_SYNC_1 and buffer[i+1] == UBX_SYNC_2:
-                        resp_class, resp_id, resp_payload = parse_ubx_response(buffer[i:])
+    resp_payload = _read_ubx_response(ser, _MON_VER_HEADER)
+    if resp_payload is None:
+        return "Unknown"
 
-                        if resp_class == 0x0A and resp_id == 0x04 and resp_payload:
-                            # Parse SW version (first 30 bytes)
-                            sw_version = resp_payload[:30].decode('ascii', errors='ignore').rstrip('\x00')
-                            return sw_version
-
-        time.sleep(0.05)
-
-    return "Unknown"
+    # Parse SW version (first 30 bytes)
+    return _cstr(resp_payload, 30)
 
 
 def main():
@@ -255,12 +355,12 @@ def main():
         print("UART1 Port Configuration (connected to Raspberry Pi):")
         print("-" * 80)
         uart1_config = query_port_config(ser, 1)
-        if uart1_config:
-            print(f"Baudrate: {uart1_config.get('baudrate', 'Unknown')}")
-            print(f"UBX Input:  {'Enabled' if uart1_config.get('ubx_in') else 'Disabled'}")
-            print(f"UBX Output: {'Enabled' if uart1_config.get('ubx_out') else 'Disabled'}")
-            print(f"NMEA Input:  {'Enabled' if uart1_config.get('nmea_in') else 'Disabled'}")
-            print(f"NMEA Output: {'Enabled' if uart1_config.get('nmea_out') else 'Disabled'}")
+        if uart1_config is not None:
+            print(f"Baudrate: {uart1_config.baudrate}")
+            print(f"UBX Input:  {'Enabled' if uart1_config.ubx_in else 'Disabled'}")
+            print(f"UBX Output: {'Enabled' if uart1_config.ubx_out else 'Disabled'}")
+            print(f"NMEA Input:  {'Enabled' if uart1_config.nmea_in else 'Disabled'}")
+            print(f"NMEA Output: {'Enabled' if uart1_config.nmea_out else 'Disabled'}")
         else:
             print("Failed to query port configuration")
         print()
@@ -273,8 +373,11 @@ def main():
 
         critical_missing = []
 
-        for (msg_class, msg_id), name in sorted(MESSAGES_TO_CHECK.items(), key=lambda x: x[1]):
-            rates = query_message_rate(ser, msg_class, msg_id)
+        # Poll every message rate in one pipelined batch
+        all_rates = query_message_rates(ser, MESSAGES_TO_CHECK)
+
+        for (msg_class, msg_id), name in _SORTED_MESSAGES:
+            rates = all_rates.get((msg_class, msg_id), {})
 
             uart1_rate = rates.get(1, 0)  # Port 1 = UART1
 
@@ -289,13 +392,11 @@ def main():
                 rate_str = "0 Hz"
 
                 # Check if this is a critical message
-                if "CRITICAL" in name.upper():
+                if name in _CRITICAL:
                     critical_missing.append(name)
 
             print(f"{name:<55} {rate_str:<10} {status}")
 
-            time.sleep(0.1)  # Small delay between queries
-
         print()
 
         # Summary
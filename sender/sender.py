@@ -6,14 +6,36 @@ Reads live GNSS data from a serial device and sends batches to central-ingest.
 Forwards raw NMEA and UBX data for central processing.
 """
 
+import gzip
+import json
+import base64
 import time
 import uuid
 import logging
-from typing import Dict, Any, List
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Any, List, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import config
-from gnss_reader import GNSSReader
+from gnss_reader import GNSSReader, GNSSReaderProcess
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +44,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Request body encoding to try next when ingest rejects the current one
+COMPRESSION_FALLBACK = {"zstd": "gzip", "gzip": "none"}
+
+# Responses meaning ingest can't read the body encoding: 415 Unsupported
+# Media Type, or 400 from a server parsing compressed bytes as JSON.
+# Any other 4xx (bad API key, schema error) is a real error, not a cue to fall back
+ENCODING_REJECTED_STATUSES = (415, 400)
+
 
 class GroundNodeSender:
     """
@@ -32,19 +62,83 @@ class GroundNodeSender:
         """Initialize sender"""
         self.station_id = config.station_id
         self.station_name = config.station_name
+        self.ingest_url = config.ingest_url
+        self.send_interval = config.send_interval
         self.sequence_number = 0
+
+        # Batch IDs reuse one random UUID per process and put the sequence
+        # number in its first field: still a valid UUID string, no urandom per batch
+        self.batch_id_suffix = str(uuid.uuid4())[8:]
+
+        # Static batch fields, copied into every batch
+        self.base_batch = {
+            "station_id": self.station_id,
+            "station_name": self.station_name,
+            "is_reference_station": config.is_reference_station,
+        }
+        if config.is_reference_station:
+            self.base_batch["known_position"] = (
+                config.latitude,
+                config.longitude,
+                config.antenna_height
+            )
+
         self.session = requests.Session()
         self.session.headers.update({
             "Authorization": f"Bearer {config.api_key}",
             "Content-Type": "application/json",
+            "Connection": "keep-alive",
         })
 
+        # Reuse one upstream connection and retry transient gateway errors
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=["POST"],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Request body compression (zstd needs the zstandard package)
+        self.compression = config.request_compression
+        if self.compression == "zstd" and zstandard is None:
+            logger.warning("zstandard not installed, compressing request bodies with gzip")
+            self.compression = "gzip"
+        self.zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+        # Set once ingest accepts a body in the current encoding
+        self.compression_confirmed = self.compression == "none"
+
+        # Body format (msgpack ships UBX as raw bytes, JSON as base64 strings)
+        self.payload_format = config.payload_format
+        if self.payload_format == "msgpack" and msgpack is None:
+            logger.warning("msgpack not installed, sending batches as JSON")
+            self.payload_format = "json"
+
+        # Single background worker: batches go out in order, but a slow POST
+        # never blocks the main loop
+        self.send_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sender")
+        self.batches_sent = 0
+        self.batches_failed = 0
+        self.batches_dropped = 0
+
+        # Queued sends, oldest first; bounded so an ingest outage can't
+        # grow the backlog without limit
+        self.pending: Deque[Future] = deque()
+        self.max_pending_batches = config.max_pending_batches
+
         # Initialize GNSS reader for live data collection
         logger.info(f"Initializing GNSS reader: {config.gnss_device} @ {config.gnss_baud_rate} baud")
-        self.reader = GNSSReader(config.gnss_device, config.gnss_baud_rate)
+        reader_cls = GNSSReaderProcess if config.reader_process else GNSSReader
+        self.reader = reader_cls(config.gnss_device, config.gnss_baud_rate)
 
         logger.info(f"Ground Node Sender initialized: {self.station_id}")
-        logger.info(f"Target: {config.ingest_url}")
+        logger.info(f"Target: {self.ingest_url}")
         logger.info(f"Antenna position: {config.latitude}, {config.longitude}, {config.antenna_height}m MSL")
 
     def create_batch(self) -> Dict[str, Any]:
@@ -52,39 +146,86 @@ class GroundNodeSender:
         Create a batch from live GNSS data.
 
         Returns:
-            Batch dictionary matching IngestBatch schema
+            Batch dictionary matching IngestBatch schema (UBX still raw bytes)
         """
-        # Get buffered GNSS data
-        nmea_lines, ubx_base64 = self.reader.get_buffered_data()
+        # Get buffered GNSS data (UBX is encoded for the wire at send time)
+        nmea_lines, ubx_raw = self.reader.get_buffered_raw_data()
 
         # Increment sequence number
         self.sequence_number += 1
 
-        # Build batch with raw data
-        batch = {
-            "station_id": self.station_id,
-            "station_name": self.station_name,
-            "batch_id": str(uuid.uuid4()),
-            "sequence_number": self.sequence_number,
-            "recv_ts": time.time(),
-            "nmea_raw": nmea_lines,  # Raw NMEA strings
-            "ubx_raw": ubx_base64,    # Base64-encoded UBX messages
-            "is_reference_station": config.is_reference_station,
-        }
-
-        # Add known position if reference station
-        if config.is_reference_station:
-            batch["known_position"] = (
-                config.latitude,
-                config.longitude,
-                config.antenna_height
-            )
+        # Build batch with raw data on top of the static fields
+        batch = self.base_batch.copy()
+        batch.update(
+            batch_id=f"{self.sequence_number & 0xFFFFFFFF:08x}{self.batch_id_suffix}",
+            sequence_number=self.sequence_number,
+            recv_ts=time.time(),
+            nmea_raw=nmea_lines,  # Raw NMEA strings
+            ubx_raw=ubx_raw,      # Raw UBX message bytes
+        )
 
         return batch
 
-    def send_batch(self, batch: Dict[str, Any]) -> bool:
+    def send_batch(self, batch: Dict[str, Any]) -> Future:
+        """
+        Queue batch for transmission to central-ingest service.
+
+        Args:
+            batch: Batch dictionary
+
+        Returns:
+            Future resolving to True if successful, False otherwise
         """
-        Send batch to central-ingest service.
+        # Forget sends that have finished (the single worker runs them in order)
+        pending = self.pending
+        while pending and pending[0].done():
+            pending.popleft()
+
+        # Ingest is falling behind: drop the oldest batch that hasn't started
+        if len(pending) >= self.max_pending_batches:
+            for queued in pending:
+                if queued.cancel():
+                    pending.remove(queued)
+                    logger.warning(f"Send queue full ({self.max_pending_batches} batches), dropped oldest batch")
+                    break
+
+        future = self.send_pool.submit(self._post_batch, batch)
+        pending.append(future)
+        return future
+
+    def _encode_body(self, batch: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Serialize and compress batch for the request body.
+
+        Args:
+            batch: Batch dictionary
+
+        Returns:
+            Tuple of (body, extra_headers)
+        """
+        if self.payload_format == "msgpack":
+            body = msgpack.packb(batch, use_bin_type=True)
+            headers = {"Content-Type": "application/msgpack"}
+        else:
+            # JSON can't carry bytes: base64-encode UBX here, off the main loop
+            batch = dict(batch, ubx_raw=[base64.b64encode(msg).decode('ascii') for msg in batch["ubx_raw"]])
+            if orjson is not None:
+                body = orjson.dumps(batch)
+            else:
+                body = json.dumps(batch, allow_nan=False).encode("utf-8")
+            headers = {}
+
+        if self.compression == "zstd":
+            headers["Content-Encoding"] = "zstd"
+            return self.zstd_compressor.compress(body), headers
+        if self.compression == "gzip":
+            headers["Content-Encoding"] = "gzip"
+            return gzip.compress(body, compresslevel=6), headers
+        return body, headers
+
+    def _post_batch(self, batch: Dict[str, Any]) -> bool:
+        """
+        POST batch to central-ingest service (runs on the send worker).
 
         Args:
             batch: Batch dictionary
@@ -93,13 +234,34 @@ class GroundNodeSender:
             True if successful, False otherwise
         """
         try:
+            body, headers = self._encode_body(batch)
             response = self.session.post(
-                config.ingest_url,
-                json=batch,
+                self.ingest_url,
+                data=body,
+                headers=headers,
                 timeout=10.0
             )
 
+            # Ingest hasn't yet accepted a body in this encoding and can't read it:
+            # step down zstd -> gzip -> none and resend, keeping the fallback
+            while (response.status_code in ENCODING_REJECTED_STATUSES
+                   and self.compression != "none" and not self.compression_confirmed):
+                fallback = COMPRESSION_FALLBACK[self.compression]
+                logger.warning(
+                    f"Ingest rejected {self.compression} request body "
+                    f"({response.status_code}), falling back to {fallback}"
+                )
+                self.compression = fallback
+                body, headers = self._encode_body(batch)
+                response = self.session.post(
+                    self.ingest_url,
+                    data=body,
+                    headers=headers,
+                    timeout=10.0
+                )
+
             if response.status_code == 202:
+                self.compression_confirmed = True
                 result = response.json()
                 logger.info(
                     f"✓ Batch {batch['batch_id'][:8]} accepted "
@@ -117,19 +279,45 @@ class GroundNodeSender:
             logger.error(f"✗ Failed to send batch: {e}")
             return False
 
+    def _record_result(self, future: Future):
+        """
+        Update statistics when a queued batch completes.
+
+        Args:
+            future: Completed future returned by send_batch
+        """
+        # Dropped from a full queue or at shutdown, never sent
+        if future.cancelled():
+            self.batches_dropped += 1
+            return
+
+        error = future.exception()
+        if error is not None:
+            logger.error(f"✗ Failed to send batch: {error}")
+
+        if error is None and future.result():
+            self.batches_sent += 1
+        else:
+            self.batches_failed += 1
+
+        # Log statistics periodically
+        total = self.batches_sent + self.batches_failed
+        if total % 10 == 0:
+            logger.info(
+                f"Stats: {self.batches_sent} sent, {self.batches_failed} failed, "
+                f"{self.batches_dropped} dropped, success rate={(self.batches_sent/total*100):.1f}%"
+            )
+
     def run(self):
         """
         Main sender loop: read GNSS data and send batches periodically.
         """
         logger.info("=" * 80)
         logger.info(f"Starting Ground Node Sender: {self.station_id}")
-        logger.info(f"Sending every {config.send_interval} seconds")
+        logger.info(f"Sending every {self.send_interval} seconds")
         logger.info("Press Ctrl+C to stop")
         logger.info("=" * 80)
 
-        batches_sent = 0
-        batches_failed = 0
-
         try:
             # Start GNSS reader
             self.reader.start()
@@ -138,33 +326,29 @@ class GroundNodeSender:
                 # Create batch from buffered data
                 batch = self.create_batch()
 
-                # Send to central-ingest
-                success = self.send_batch(batch)
-
-                if success:
-                    batches_sent += 1
-                else:
-                    batches_failed += 1
-
-                # Log statistics periodically
-                if (batches_sent + batches_failed) % 10 == 0:
-                    logger.info(
-                        f"Stats: {batches_sent} sent, {batches_failed} failed, "
-                        f"success rate={(batches_sent/(batches_sent+batches_failed)*100):.1f}%"
-                    )
+                # Send to central-ingest in the background
+                future = self.send_batch(batch)
+                future.add_done_callback(self._record_result)
 
                 # Wait before next send
-                time.sleep(config.send_interval)
+                time.sleep(self.send_interval)
 
         except KeyboardInterrupt:
             logger.info("\n" + "=" * 80)
             logger.info("Shutting down sender...")
-            logger.info(f"Final stats: {batches_sent} sent, {batches_failed} failed")
-            logger.info("=" * 80)
         finally:
             # Stop GNSS reader
             self.reader.stop()
 
+            # Let the in-flight send finish, drop anything still queued
+            self.send_pool.shutdown(wait=True, cancel_futures=True)
+
+            logger.info(
+                f"Final stats: {self.batches_sent} sent, {self.batches_failed} failed, "
+                f"{self.batches_dropped} dropped"
+            )
+            logger.info("=" * 80)
+
 
 def main():
     """Entry point"""
@@ -3,8 +3,10 @@
 Test script for GNSS reader
 """
 
+import time
 import logging
-from gnss_reader import SimulatedGNSSReader
+from config import config
+from gnss_reader import GNSSReader
 
 # Configure logging
 logging.basicConfig(
@@ -12,42 +14,63 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
-def test_simulated_reader():
-    """Test simulated GNSS reader"""
+ITERATIONS = 1000
+POLL_INTERVAL = 0.01  # seconds between batches (10s run)
+
+
+def test_reader():
+    """Test live GNSS reader and time batch retrieval"""
     print("=" * 80)
-    print("Testing Simulated GNSS Reader")
+    print(f"Testing GNSS Reader: {config.gnss_device} @ {config.gnss_baud_rate} baud")
     print("=" * 80)
 
     # Initialize reader
-    reader = SimulatedGNSSReader(
-        nmea_file="examples/17.nmea.txt",
-        ubx_file="examples/17.ubx.txt"
-    )
+    reader = GNSSReader(config.gnss_device, config.gnss_baud_rate)
 
     # Start reader
     reader.start()
 
-    # Get a few batches
-    for i in range(5):
-        nmea_lines, ubx_base64 = reader.get_buffered_data()
+    # Pull batches at a steady rate, timing only the reader calls
+    batches = 0
+    nmea_total = 0
+    ubx_total = 0
+    ubx_chars = 0
+    busy = 0.0
+    last_nmea = None
 
-        print(f"\nBatch {i+1}:")
-        print(f"  NMEA lines: {len(nmea_lines)}")
-        print(f"  UBX messages: {len(ubx_base64)}")
+    start = time.perf_counter()
+    try:
+        for _ in range(ITERATIONS):
+            t0 = time.perf_counter()
+            nmea_lines, ubx_base64 = reader.get_buffered_data()
+            busy += time.perf_counter() - t0
 
-        if nmea_lines:
-            print(f"  First NMEA: {nmea_lines[0][:60]}...")
-            print(f"  Last NMEA:  {nmea_lines[-1][:60]}...")
+            batches += 1
+            nmea_total += len(nmea_lines)
+            ubx_total += len(ubx_base64)
+            ubx_chars += sum(map(len, ubx_base64))
+            if nmea_lines:
+                last_nmea = nmea_lines[-1]
 
-        if ubx_base64:
-            print(f"  UBX data length: {len(ubx_base64[0])} chars")
+            time.sleep(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - start
 
     # Stop reader
     reader.stop()
 
+    print(
+        f"\n{elapsed:.1f}s: {nmea_total} NMEA lines ({nmea_total / elapsed:.1f}/s), "
+        f"{ubx_total} UBX messages ({ubx_chars / elapsed:.0f} base64 chars/s), "
+        f"get_buffered_data {busy * 1e6 / max(batches, 1):.1f} us/call"
+    )
+    if last_nmea:
+        print(f"Last NMEA: {last_nmea[:60]}...")
+
     print("\n" + "=" * 80)
     print("Test completed successfully!")
     print("=" * 80)
 
 if __name__ == "__main__":
-    test_simulated_reader()
+    test_reader()